@@ -1,10 +1,110 @@
+import hashlib
 import io
 import logging
-from PyPDF2 import PdfReader
-import re
-
+import threading
+import time
+from collections import OrderedDict
 logger = logging.getLogger(__name__)
 
+
+class DocumentExtractionError(RuntimeError):
+    """Raised when text can't be extracted from a document."""
+
+
+class UnsupportedFileTypeError(DocumentExtractionError, ValueError):
+    """Raised for file types the converter has no extractor for."""
+
+    def __init__(self, file_type: str):
+        super().__init__(f"Unsupported file type: {file_type}")
+        self.file_type = file_type
+
+
+# PDF parsers are imported on first use to keep app startup fast
+_NOT_LOADED = object()
+PdfReader = _NOT_LOADED
+pymupdf = _NOT_LOADED  # C-backed parser, much faster than pypdf on text PDFs; None if not installed
+
+
+def _load_pdf_reader():
+    """Import pypdf's PdfReader on first use."""
+    global PdfReader
+    if PdfReader is _NOT_LOADED:
+        from pypdf import PdfReader as pdf_reader_cls
+        PdfReader = pdf_reader_cls
+    return PdfReader
+
+
+def _load_pymupdf():
+    """Import PyMuPDF on first use; returns None if it isn't installed."""
+    global pymupdf
+    if pymupdf is _NOT_LOADED:
+        try:
+            import pymupdf as pymupdf_module
+        except ImportError:
+            pymupdf_module = None
+        pymupdf = pymupdf_module
+    return pymupdf
+
+# Drops surrogate code points (which can't be encoded) and the U+FFFD replacement character
+_CLEAN_TABLE = dict.fromkeys(range(0xD800, 0xE000))
+_CLEAN_TABLE[0xFFFD] = None
+
+# Extracted text is cached by content hash so re-uploads skip parsing
+EXTRACTION_CACHE_SIZE = 256
+EXTRACTION_CACHE_TTL_SECONDS = 300
+EXTRACTION_CACHE_MAX_BYTES = 10 * 1024 * 1024
+# Budget on the characters held across all entries, so the cache as a whole stays bounded
+EXTRACTION_CACHE_MAX_CHARS = 16 * 1024 * 1024
+
+_extraction_cache = OrderedDict()  # (file_type, digest) -> (expires_at, text)
+_extraction_cache_chars = 0
+_extraction_cache_lock = threading.Lock()
+
+
+def _cache_pop(key) -> None:
+    """Remove key and its characters from the cache; the caller holds the lock."""
+    global _extraction_cache_chars
+    _, text = _extraction_cache.pop(key)
+    _extraction_cache_chars -= len(text)
+
+
+def _cache_get(key):
+    """Return cached text for key, or None if missing or expired."""
+    with _extraction_cache_lock:
+        entry = _extraction_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            _cache_pop(key)
+            return None
+        _extraction_cache.move_to_end(key)
+        return text
+
+
+def _cache_put(key, text: str) -> None:
+    """Store text for key, evicting the least recently used entries past the count or size limit."""
+    global _extraction_cache_chars
+    if len(text) > EXTRACTION_CACHE_MAX_CHARS:
+        return
+    with _extraction_cache_lock:
+        if key in _extraction_cache:
+            _cache_pop(key)
+        _extraction_cache[key] = (time.monotonic() + EXTRACTION_CACHE_TTL_SECONDS, text)
+        _extraction_cache_chars += len(text)
+        while (len(_extraction_cache) > EXTRACTION_CACHE_SIZE
+               or _extraction_cache_chars > EXTRACTION_CACHE_MAX_CHARS):
+            _cache_pop(next(iter(_extraction_cache)))
+
+
+def clear_extraction_cache() -> None:
+    """Drop all cached extraction results."""
+    global _extraction_cache_chars
+    with _extraction_cache_lock:
+        _extraction_cache.clear()
+        _extraction_cache_chars = 0
+
+
 class DocumentConverter:
     """Handles extraction of text from uploaded documents."""
     def __init__(self):
@@ -17,15 +117,10 @@ class DocumentConverter:
             return text
             
         try:
-            # Remove or replace Unicode surrogate characters and other problematic characters
-            # This handles emoji and other special Unicode characters that cause encoding issues
-            text = text.encode('utf-8', errors='ignore').decode('utf-8')
-            
-            # Remove remaining surrogate characters using regex
-            text = re.sub(r'[\ud800-\udfff]', '', text)
-            
-            # Replace common problematic characters
-            text = text.replace('\ufffd', '')  # Remove replacement character
+            # Remove surrogate and replacement characters in a single pass;
+            # ASCII text can't contain either, so skip the scan
+            if not text.isascii():
+                text = text.translate(_CLEAN_TABLE)
             
             # Normalize whitespace
             text = ' '.join(text.split())
@@ -38,19 +133,15 @@ class DocumentConverter:
 
     def _extract_pdf_text(self, content: bytes) -> str:
         """Extract text from PDF content."""
-        pdf_file = io.BytesIO(content)
-        pdf_reader = PdfReader(pdf_file)
-        
-        extracted_text = ""
-        total_pages = len(pdf_reader.pages)
-        
-        for page_num, page in enumerate(pdf_reader.pages):
+        extracted_text = None
+        if _load_pymupdf() is not None:
             try:
-                page_text = page.extract_text() or ""
-                extracted_text += page_text
+                extracted_text, total_pages = self._extract_pdf_pages_pymupdf(content)
             except Exception as e:
-                logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
-                continue
+                logger.warning(f"PyMuPDF could not read PDF, falling back to pypdf: {str(e)}")
+        
+        if extracted_text is None:
+            extracted_text, total_pages = self._extract_pdf_pages_pypdf(content)
         
         cleaned_text = self._clean_text(extracted_text)
         
@@ -65,21 +156,50 @@ class DocumentConverter:
         logger.debug(f"Successfully extracted {len(cleaned_text)} characters from {total_pages} pages")
         return cleaned_text
 
+    def _extract_pdf_pages_pymupdf(self, content: bytes):
+        """Extract PDF page text with PyMuPDF; returns (text, total_pages)."""
+        # PyMuPDF isn't thread-safe, so pages are read serially; it's still far faster than pypdf
+        with pymupdf.open(stream=content, filetype="pdf") as doc:
+            parts = []
+            for page_num, page in enumerate(doc):
+                try:
+                    page_text = page.get_text("text")
+                    if page_text:
+                        parts.append(page_text)
+                except Exception as e:
+                    logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
+                    continue
+            return "".join(parts), doc.page_count
+
+    def _extract_pdf_pages_pypdf(self, content: bytes):
+        """Extract PDF page text with pypdf; returns (text, total_pages)."""
+        # BytesIO shares an exact bytes object until written to, so this doesn't copy the upload;
+        # wrapping content in a memoryview or bytearray first would force a full copy
+        pdf_file = io.BytesIO(content)
+        pdf_reader = _load_pdf_reader()(pdf_file)
+        
+        total_pages = len(pdf_reader.pages)
+        
+        parts = []
+        for page_num, page in enumerate(pdf_reader.pages):
+            try:
+                page_text = page.extract_text()
+                if page_text:
+                    parts.append(page_text)
+            except Exception as e:
+                logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
+                continue
+        extracted_text = "".join(parts)
+        
+        return extracted_text, total_pages
+
     def _extract_plain_text(self, content: bytes) -> str:
         """Extract text from plain text content."""
         try:
             text = content.decode("utf-8")
         except UnicodeDecodeError:
-            # Try with different encodings if UTF-8 fails
-            for encoding in ['latin1', 'cp1252', 'ascii']:
-                try:
-                    text = content.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                # If all encodings fail, use utf-8 with error handling
-                text = content.decode("utf-8", errors='ignore')
+            # latin1 maps every byte to a code point, so this decode cannot fail
+            text = content.decode("latin1")
         
         cleaned_text = self._clean_text(text)
         if not cleaned_text or len(cleaned_text.strip()) < 1:
@@ -87,18 +207,35 @@ class DocumentConverter:
         
         return cleaned_text
 
+    # Maps each supported MIME type to its extractor
+    _EXTRACTORS = {
+        "application/pdf": _extract_pdf_text,
+        "text/plain": _extract_plain_text,
+    }
+
     def extract_text(self, content: bytes, file_type: str) -> str:
         """Extracts text from a document based on its file type."""
+        # Reject unsupported types before hashing or parsing anything
+        extractor = self._EXTRACTORS.get(file_type)
+        if extractor is None:
+            raise UnsupportedFileTypeError(file_type)
+        
+        cache_key = None
+        if len(content) <= EXTRACTION_CACHE_MAX_BYTES:
+            cache_key = (file_type, hashlib.blake2b(content, digest_size=16).digest())
+            cached_text = _cache_get(cache_key)
+            if cached_text is not None:
+                return cached_text
+        
         try:
-            if file_type == "application/pdf":
-                return self._extract_pdf_text(content)
-            elif file_type == "text/plain":
-                return self._extract_plain_text(content)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+            text = extractor(self, content)
         except ValueError:
             # Re-raise ValueError with specific messages
             raise
         except Exception as e:
             logger.error(f"Error extracting text from document: {str(e)}")
-            raise RuntimeError(f"Error extracting text: {str(e)}")
\ No newline at end of file
+            raise DocumentExtractionError(f"Error extracting text: {str(e)}") from e
+        
+        if cache_key is not None:
+            _cache_put(cache_key, text)
+        return text
@@ -1,6 +1,5 @@
 import os
 import uuid
-import PyPDF2
 from typing import List, Dict, Any
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
@@ -1,9 +1,47 @@
 import google.generativeai as genai
+import asyncio
+import hashlib
 import re
+import sqlite3
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from app.core.config import settings
 
+# Maximum number of texts Gemini accepts in a single embed_content call
+GEMINI_BATCH_LIMIT = 100
+
+# Number of recent single-text embeddings kept per generator
+EMBEDDING_CACHE_SIZE = 1000
+
+# Attempts per embed_content call before a transient failure is surfaced
+EMBEDDING_MAX_ATTEMPTS = 5
+
+# Errors worth retrying: network blips, Gemini overload and rate limiting
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, ServiceUnavailable, ResourceExhausted)
+
+
+def _normalize_for_cache(text: str) -> str:
+    """Fold compatibility forms and whitespace so byte-level variants share a cache key."""
+    # Case and punctuation can change meaning ("US" vs "us"), so they stay part of the key
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def _pack_vector(embedding: list[float]) -> bytes:
+    """Quantize a vector to float16 bytes for caching (2 bytes per dimension)."""
+    return struct.pack(f"{len(embedding)}e", *embedding)
+
+
+def _unpack_vector(blob: bytes) -> list[float]:
+    """Expand float16 cache bytes back into a list of floats."""
+    return list(struct.unpack(f"{len(blob) // 2}e", blob))
+
 class EmbeddingGenerator:
-    def __init__(self, model_name="models/embedding-001", task_type="RETRIEVAL_DOCUMENT"):
+    def __init__(self, model_name="models/embedding-001", task_type="RETRIEVAL_DOCUMENT",
+                 cache_size=EMBEDDING_CACHE_SIZE, cache_path=None):
         self.api_key = settings.GEMINI_API_KEY
         if not self.api_key:
             raise ValueError("Missing GEMINI_API_KEY in environment.")
@@ -11,6 +49,32 @@ class EmbeddingGenerator:
         genai.configure(api_key=self.api_key)
         self.model_name = model_name
         self.task_type = task_type
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Optional on-disk layer under the in-memory LRU, so vectors survive restarts.
+        # Batch embedding runs on executor threads, so every use of the shared
+        # connection goes through _cache_lock.
+        self._db = None
+        if cache_path:
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS emb_f16 (k BLOB PRIMARY KEY, v BLOB)")
+            self._db.commit()
+
+    def close(self) -> None:
+        """Close the on-disk cache, if any; the in-memory LRU keeps working."""
+        with self._cache_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
     def _sanitize_text(self, text: str) -> str:
         """Sanitize text to ensure it's safe for API calls."""
@@ -43,14 +107,123 @@ class EmbeddingGenerator:
             if not sanitized_text.strip():
                 raise ValueError("Text is empty after sanitization")
             
-            response = genai.embed_content(
-                model=self.model_name,
-                content=sanitized_text,
-                task_type=self.task_type
-            )
+            # Identical chunks and repeated queries reuse the earlier vector
+            cache_key = hashlib.blake2b(
+                f"{self.model_name}|{self.task_type}|{_normalize_for_cache(sanitized_text)}".encode('utf-8'),
+                digest_size=16
+            ).digest()
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
+            response = self._call_api(sanitized_text)
             embedding = response.get("embedding")
             if not embedding or not isinstance(embedding, list):
                 raise ValueError("Invalid embedding response from Gemini API")
+            
+            self._cache_put(cache_key, embedding)
             return embedding
         except Exception as e:
-            raise RuntimeError(f"Gemini embedding failed: {e}")
\ No newline at end of file
+            raise RuntimeError(f"Gemini embedding failed: {e}")
+
+    def _remember(self, key: bytes, embedding: tuple) -> None:
+        """Insert a vector into the in-memory LRU; the caller holds the cache lock."""
+        self._cache[key] = embedding
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_get(self, key: bytes):
+        """Return the cached vector for key from memory, then disk, or None."""
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+                return list(embedding)
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT v FROM emb_f16 WHERE k = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            embedding = _unpack_vector(row[0])
+            self._remember(key, tuple(embedding))
+            return embedding
+
+    def _cache_put(self, key: bytes, embedding: list[float]) -> None:
+        """Store a fresh vector exactly in memory and, when configured, as float16 on disk."""
+        with self._cache_lock:
+            # Tuples keep callers from mutating the cached vector through a returned list
+            self._remember(key, tuple(embedding))
+            if self._db is None:
+                return
+            try:
+                blob = _pack_vector(embedding)
+            except (OverflowError, struct.error):
+                # Values outside float16 range are not worth a lossy disk entry
+                return
+            self._db.execute("INSERT OR REPLACE INTO emb_f16 (k, v) VALUES (?, ?)", (key, blob))
+            self._db.commit()
+
+    @retry(
+        stop=stop_after_attempt(EMBEDDING_MAX_ATTEMPTS),
+        wait=wait_exponential_jitter(initial=0.5, max=8),
+        retry=retry_if_exception_type(TRANSIENT_ERRORS),
+        reraise=True,
+    )
+    def _call_api(self, content):
+        """Call embed_content, backing off and retrying on transient errors."""
+        return genai.embed_content(
+            model=self.model_name,
+            content=content,
+            task_type=self.task_type
+        )
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        """Embed one batch of already sanitized texts with a single API call."""
+        response = self._call_api(batch)
+        embeddings = response.get("embedding")
+        if (not isinstance(embeddings, list) or len(embeddings) != len(batch)
+                or not all(embedding and isinstance(embedding, list) for embedding in embeddings)):
+            raise ValueError("Invalid embedding response from Gemini API")
+        return embeddings
+
+    def _sanitize_all(self, texts: list[str]) -> list[str]:
+        """Sanitize every text, rejecting the batch if any ends up empty."""
+        sanitized_texts = [self._sanitize_text(text) for text in texts]
+        if any(not text.strip() for text in sanitized_texts):
+            raise ValueError("Text is empty after sanitization")
+        return sanitized_texts
+
+    def get_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Embed several texts in order, sending at most GEMINI_BATCH_LIMIT per API call."""
+        try:
+            sanitized_texts = self._sanitize_all(texts)
+            
+            embeddings = []
+            for start in range(0, len(sanitized_texts), GEMINI_BATCH_LIMIT):
+                embeddings.extend(self._embed_batch(sanitized_texts[start:start + GEMINI_BATCH_LIMIT]))
+            return embeddings
+        except Exception as e:
+            raise RuntimeError(f"Gemini embedding failed: {e}")
+
+    async def get_embeddings_concurrent(self, texts: list[str], batch_size: int = GEMINI_BATCH_LIMIT,
+                                        max_in_flight: int = 3) -> list[list[float]]:
+        """Embed texts in order, keeping up to max_in_flight batch calls running at once."""
+        try:
+            sanitized_texts = self._sanitize_all(texts)
+            batches = [sanitized_texts[start:start + batch_size]
+                       for start in range(0, len(sanitized_texts), batch_size)]
+            
+            # The Gemini client is blocking, so each batch runs on the default executor
+            loop = asyncio.get_running_loop()
+            semaphore = asyncio.Semaphore(max_in_flight)
+            
+            async def embed(batch):
+                async with semaphore:
+                    return await loop.run_in_executor(None, self._embed_batch, batch)
+            
+            # gather keeps results in submission order, so vectors line up with texts
+            results = await asyncio.gather(*(embed(batch) for batch in batches))
+            return [embedding for batch_embeddings in results for embedding in batch_embeddings]
+        except Exception as e:
+            raise RuntimeError(f"Gemini embedding failed: {e}")
@@ -1,11 +1,20 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import List
 
+# Number of recently chunked texts remembered per chunker
+CHUNK_CACHE_SIZE = 32
+
 class TextChunker:
     """Handles text splitting with configurable chunk size and overlap."""
     
-    def __init__(self, chunk_size: int = 1000, overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200, cache_size: int = CHUNK_CACHE_SIZE):
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def chunk_text(self, text: str) -> List[str]:
         """Splits text into chunks with specified size and overlap."""
@@ -13,6 +22,15 @@ class TextChunker:
             if not text:
                 raise ValueError("Input text is empty")
             
+            # Re-ingesting the same document reuses the earlier split
+            cache_key = (hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest(),
+                         self.chunk_size, self.overlap)
+            with self._cache_lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    return list(cached)
+            
             chunks = []
             start = 0
             text_length = len(text)
@@ -37,6 +55,11 @@ class TextChunker:
                 else:
                     start = end
             
+            with self._cache_lock:
+                # Stored as a tuple so callers editing their list can't corrupt later hits
+                self._cache[cache_key] = tuple(chunks)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
             return chunks
         except Exception as e:
             raise Exception(f"Error chunking text: {str(e)}")
\ No newline at end of file
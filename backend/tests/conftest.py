@@ -1,6 +1,7 @@
 import pytest
 import os
 import tempfile
+from types import MappingProxyType
 from unittest.mock import patch, MagicMock
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -39,6 +40,15 @@ import json
 with open("/tmp/test_firebase_key.json", "w") as f:
     json.dump(test_firebase_key, f)
 
+# Patch Firebase at import time so test modules can import app.* directly
+_fb_patches = [
+    patch('firebase_admin.credentials.Certificate'),
+    patch('firebase_admin.initialize_app'),
+    patch.dict('firebase_admin._apps', {'[DEFAULT]': MagicMock()}),
+]
+for _p in _fb_patches:
+    _p.start()
+
 # Mock Firebase services before any Firebase imports
 @pytest.fixture(scope="session", autouse=True)
 def mock_firebase():
@@ -71,12 +81,24 @@ def test_db():
     test_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return test_session_local
 
-@pytest.fixture
-def client():
-    """Create a test client."""
-    # Import app after Firebase is mocked
+@pytest.fixture(scope="session")
+def _prebuild_app():
+    """Import the app and build its OpenAPI schema once per session."""
+    # Not autouse: importing app.main creates the database tables, so only tests using the app need a DB
     from app.main import app
-    return TestClient(app)
+    # openapi() stores its result on app.openapi_schema and reuses it afterwards
+    app.openapi()
+    return app
+
+@pytest.fixture(scope="session")
+def client(_prebuild_app):
+    """Create a test client shared across the session."""
+    return TestClient(_prebuild_app)
+
+@pytest.fixture(scope="session")
+def mock_user_info():
+    """Read-only user info shared across the session."""
+    return MappingProxyType({"uid": "test-uid"})
 
 @pytest.fixture
 def db_session(test_db):
@@ -0,0 +1,84 @@
+import pytest
+import uuid
+from unittest.mock import Mock, patch, AsyncMock
+from datetime import datetime, timezone
+
+# Firebase is already patched by the top-level conftest
+from app.main import app
+from app.content_generator.models import ContentItem
+from app.document_upload.model import UserCollection
+from app.auth.firebase_auth import get_current_user
+from app.core.database import get_db
+
+# Built once; content_generator_mock resets it between tests
+_GENERATOR_INSTANCE = Mock()
+_GENERATOR_INSTANCE.generate_and_store_content = AsyncMock()
+
+
+@pytest.fixture
+def mock_user():
+    """Mock user data"""
+    return {"uid": "test-user-123", "email": "test@example.com"}
+
+
+@pytest.fixture(scope="session")
+def now():
+    """One timestamp for the session; timestamps are never asserted on"""
+    return datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def sample_content_item(now):
+    """Sample content item for testing"""
+    return ContentItem(
+        id=str(uuid.uuid4()),
+        user_id="test-user-123",
+        content_url="https://example.com/content.json",
+        topic="Python Programming",
+        content_type="flashcards",
+        created_at=now
+    )
+
+
+@pytest.fixture
+def sample_collection():
+    """Sample user collection for testing"""
+    return UserCollection(
+        user_id="test-user-123",
+        collection_name="default",
+        full_collection_name="test-user-123_default"
+    )
+
+
+@pytest.fixture
+def mock_requests_get():
+    """Patch requests.get with a successful response the test can fill in"""
+    with patch('requests.get') as mock_get:
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        yield mock_get, mock_response
+
+
+@pytest.fixture
+def content_generator_mock():
+    """Patch ContentGenerator in the content routes with a reusable instance mock"""
+    with patch('app.api.v1.routes.content.ContentGenerator', return_value=_GENERATOR_INSTANCE):
+        yield _GENERATOR_INSTANCE
+    # Recursive: clears call history, return values and side effects on every child
+    _GENERATOR_INSTANCE.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture
+def mock_db():
+    """Mock database session"""
+    return Mock()
+
+
+@pytest.fixture(autouse=True)
+def _deps(monkeypatch, mock_user, mock_db, _prebuild_app):
+    """Give each test its own overrides dict wiring in mock_user and mock_db"""
+    monkeypatch.setattr(app, "dependency_overrides", {
+        get_current_user: lambda: mock_user,
+        get_db: lambda: mock_db,
+    })
@@ -1,503 +1,440 @@
 import pytest
+import copy
 import uuid
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import ANY, Mock, patch, call
 from typing import List, Dict, Any
+from types import SimpleNamespace
 
-# Mock Firebase initialization before importing app modules
-with patch('firebase_admin.credentials.Certificate'), \
-     patch('firebase_admin.initialize_app'), \
-     patch('firebase_admin._apps', [MagicMock()]):
-    from app.core.vector_db import VectorDatabaseManager
+from app.core.vector_db import VectorDatabaseManager
 
 
-class TestVectorDatabaseManager:
-    """Test VectorDatabaseManager class methods"""
+QDRANT_URL = "http://localhost:6333"
+QDRANT_API_KEY = "test-key"
+COLLECTION_NAME = "test_collection"
 
-    def setup_method(self):
-        """Set up test dependencies"""
-        self.qdrant_url = "http://localhost:6333"
-        self.qdrant_api_key = "test-key"
-        self.collection_name = "test_collection"
-        
-        # Mock QdrantClient
-        self.mock_client = Mock()
-        
-        with patch('app.core.vector_db.QdrantClient') as mock_qdrant_client:
-            mock_qdrant_client.return_value = self.mock_client
-            self.vector_db = VectorDatabaseManager(
-                qdrant_url=self.qdrant_url,
-                qdrant_api_key=self.qdrant_api_key,
-                collection_name=self.collection_name
-            )
+# Shared vectors, built once per module
+_Q3 = (1.0, 2.0, 3.0)
+_EMBS_2 = ([1.0, 2.0, 3.0], [4.0, 5.0, 6.0])
 
-    def test_initialization_success(self):
-        """Test successful VectorDatabaseManager initialization"""
-        # Arrange & Act
-        with patch('app.core.vector_db.QdrantClient') as mock_qdrant_client:
-            mock_client = Mock()
-            mock_qdrant_client.return_value = mock_client
-            
-            vector_db = VectorDatabaseManager(
-                qdrant_url="http://localhost:6333",
-                qdrant_api_key="test-key",
-                collection_name="test_collection"
-            )
-            
-            # Assert
-            assert vector_db.client == mock_client
-            assert vector_db.collection_name == "test_collection"
-            mock_qdrant_client.assert_called_once_with(
-                url="http://localhost:6333",
-                api_key="test-key"
-            )
 
-    def test_initialization_failure(self):
-        """Test VectorDatabaseManager initialization failure"""
-        # Arrange
-        with patch('app.core.vector_db.QdrantClient') as mock_qdrant_client:
-            mock_qdrant_client.side_effect = Exception("Connection failed")
-            
-            # Act & Assert
-            with pytest.raises(Exception, match="Error initializing Qdrant client: Connection failed"):
-                VectorDatabaseManager(
-                    qdrant_url="invalid-url",
-                    qdrant_api_key="invalid-key",
-                    collection_name="test_collection"
-                )
-
-    def test_create_collection_new_collection(self):
-        """Test creating a new collection that doesn't exist"""
-        # Arrange
-        mock_collections_response = Mock()
-        mock_collections_response.collections = []
-        self.mock_client.get_collections.return_value = mock_collections_response
-        
-        # Act
-        result = self.vector_db.create_collection()
-        
-        # Assert
-        assert result == {"message": f"Collection {self.collection_name} created or already exists"}
-        self.mock_client.get_collections.assert_called_once()
-        self.mock_client.create_collection.assert_called_once()
-
-    def test_create_collection_existing_collection(self):
-        """Test creating a collection that already exists"""
-        # Arrange
-        mock_collection = Mock()
-        mock_collection.name = self.collection_name
-        mock_collections_response = Mock()
-        mock_collections_response.collections = [mock_collection]
-        self.mock_client.get_collections.return_value = mock_collections_response
-        
-        # Act
-        result = self.vector_db.create_collection()
-        
-        # Assert
-        assert result == {"message": f"Collection {self.collection_name} created or already exists"}
-        self.mock_client.get_collections.assert_called_once()
-        self.mock_client.create_collection.assert_not_called()
-
-    def test_create_collection_error(self):
-        """Test create_collection when an error occurs"""
-        # Arrange
-        self.mock_client.get_collections.side_effect = Exception("Database error")
-        
-        # Act & Assert
-        with pytest.raises(Exception, match="Error creating collection: Database error"):
-            self.vector_db.create_collection()
-
-    def test_delete_collection_success(self):
-        """Test successful collection deletion"""
-        # Arrange
-        self.mock_client.delete_collection.return_value = None
-        
-        # Act
-        result = self.vector_db.delete_collection()
-        
-        # Assert
-        assert result == {"message": f"Collection {self.collection_name} deleted"}
-        self.mock_client.delete_collection.assert_called_once_with(
-            collection_name=self.collection_name
+@pytest.fixture(scope="session")
+def vector_db_template():
+    """Build one VectorDatabaseManager against a patched QdrantClient for the session"""
+    with patch('app.core.vector_db.QdrantClient'):
+        return VectorDatabaseManager(
+            qdrant_url=QDRANT_URL,
+            qdrant_api_key=QDRANT_API_KEY,
+            collection_name=COLLECTION_NAME
         )
 
-    def test_delete_collection_error(self):
-        """Test delete_collection when an error occurs"""
-        # Arrange
-        self.mock_client.delete_collection.side_effect = Exception("Delete failed")
-        
-        # Act & Assert
-        with pytest.raises(Exception, match="Error deleting collection: Delete failed"):
-            self.vector_db.delete_collection()
-
-    def test_list_collections_success(self):
-        """Test successful collection listing"""
-        # Arrange
-        mock_collection1 = Mock()
-        mock_collection1.name = "collection1"
-        mock_collection2 = Mock()
-        mock_collection2.name = "collection2"
-        
-        mock_collections_response = Mock()
-        mock_collections_response.collections = [mock_collection1, mock_collection2]
-        self.mock_client.get_collections.return_value = mock_collections_response
-        
-        # Act
-        result = self.vector_db.list_collections()
-        
-        # Assert
-        assert result == ["collection1", "collection2"]
-        self.mock_client.get_collections.assert_called_once()
-
-    def test_list_collections_empty(self):
-        """Test listing collections when no collections exist"""
-        # Arrange
-        mock_collections_response = Mock()
-        mock_collections_response.collections = []
-        self.mock_client.get_collections.return_value = mock_collections_response
-        
-        # Act
-        result = self.vector_db.list_collections()
-        
-        # Assert
-        assert result == []
-        self.mock_client.get_collections.assert_called_once()
 
-    def test_list_collections_error(self):
-        """Test list_collections when an error occurs"""
-        # Arrange
-        self.mock_client.get_collections.side_effect = Exception("List failed")
-        
-        # Act & Assert
-        with pytest.raises(Exception, match="Error listing collections: List failed"):
-            self.vector_db.list_collections()
-
-    @patch('app.core.vector_db.uuid.uuid4')
-    @patch('app.core.vector_db.models.PointStruct')
-    def test_upsert_vectors_success(self, mock_point_struct, mock_uuid4):
-        """Test successful vector upserting"""
-        # Arrange
-        document_id = "doc123"
-        chunks = ["chunk1", "chunk2"]
-        embeddings = [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]
-        
-        # Mock UUID generation
-        mock_uuid4.side_effect = ["uuid1", "uuid2"]
-        
-        # Mock PointStruct creation
-        mock_point1 = Mock()
-        mock_point2 = Mock()
-        mock_point_struct.side_effect = [mock_point1, mock_point2]
-        
-        # Act
-        result = self.vector_db.upsert_vectors(document_id, chunks, embeddings)
-        
-        # Assert
-        assert result == {"message": f"Upserted 2 points for document {document_id}"}
-        assert mock_point_struct.call_count == 2
-        
-        # Verify first point creation - check key parts of payload, ignoring timestamp
-        _, first_call_kwargs = mock_point_struct.call_args_list[0]
-        assert first_call_kwargs["id"] == "uuid1"
-        assert first_call_kwargs["vector"] == [1.0, 2.0, 3.0]
-        payload = first_call_kwargs["payload"]
-        assert payload["document_id"] == document_id
-        assert payload["document_name"] is None
-        assert payload["storage_path"] is None
-        assert payload["chunk_index"] == 0
-        assert payload["text"] == "chunk1"
-        assert "upload_timestamp" in payload  # Just verify the field exists
-        
-        # Verify second point creation - check key parts of payload, ignoring timestamp
-        _, second_call_kwargs = mock_point_struct.call_args_list[1]
-        assert second_call_kwargs["id"] == "uuid2"
-        assert second_call_kwargs["vector"] == [4.0, 5.0, 6.0]
-        payload2 = second_call_kwargs["payload"]
-        assert payload2["document_id"] == document_id
-        assert payload2["document_name"] is None
-        assert payload2["storage_path"] is None
-        assert payload2["chunk_index"] == 1
-        assert payload2["text"] == "chunk2"
-        assert "upload_timestamp" in payload2  # Just verify the field exists
-        
-        self.mock_client.upsert.assert_called_once_with(
-            collection_name=self.collection_name,
-            points=[mock_point1, mock_point2]
-        )
+@pytest.fixture
+def vector_db(vector_db_template):
+    """Per-test copy of the template manager with its own mock client"""
+    vector_db = copy.copy(vector_db_template)
+    vector_db.client = Mock()
+    return vector_db
 
-    def test_upsert_vectors_empty_data(self):
-        """Test upserting with empty chunks and embeddings"""
-        # Arrange
-        document_id = "doc123"
-        chunks = []
-        embeddings = []
-        
-        # Act
-        result = self.vector_db.upsert_vectors(document_id, chunks, embeddings)
+
+@pytest.fixture(scope="module")
+def patched_uuid():
+    """uuid4 in vector_db, patched once for the module"""
+    with patch('app.core.vector_db.uuid.uuid4') as mock_uuid4:
+        yield mock_uuid4
+
+
+@pytest.fixture(scope="module")
+def patched_point_struct():
+    """models.PointStruct in vector_db, patched once for the module"""
+    with patch('app.core.vector_db.models.PointStruct') as mock_point_struct:
+        yield mock_point_struct
+
+
+@pytest.fixture(scope="module")
+def patched_vector_params():
+    """models.VectorParams in vector_db, patched once for the module"""
+    with patch('app.core.vector_db.models.VectorParams') as mock_vector_params:
+        yield mock_vector_params
+
+
+@pytest.fixture(scope="module")
+def patched_distance():
+    """models.Distance in vector_db, patched once for the module"""
+    with patch('app.core.vector_db.models.Distance') as mock_distance:
+        yield mock_distance
+
+
+_SHARED_PATCHES = ("patched_uuid", "patched_point_struct", "patched_vector_params", "patched_distance")
+
+
+@pytest.fixture(autouse=True)
+def _reset_shared_patches(request):
+    """Reset the module-scoped patches a test used, before and after it runs.
+
+    The patches stay active for the rest of the module, so later tests that
+    don't request them still go through them and must not see leftover state.
+    """
+    used = [request.getfixturevalue(name) for name in _SHARED_PATCHES if name in request.fixturenames]
+    for mock in used:
+        mock.reset_mock(return_value=True, side_effect=True)
+    yield
+    for mock in used:
+        mock.reset_mock(return_value=True, side_effect=True)
+
+
+def test_initialization_success():
+    """Test successful VectorDatabaseManager initialization"""
+    # Arrange & Act
+    with patch('app.core.vector_db.QdrantClient') as mock_qdrant_client:
+        mock_client = Mock()
+        mock_qdrant_client.return_value = mock_client
+        
+        vector_db = VectorDatabaseManager(
+            qdrant_url="http://localhost:6333",
+            qdrant_api_key="test-key",
+            collection_name="test_collection"
+        )
         
         # Assert
-        assert result == {"message": f"Upserted 0 points for document {document_id}"}
-        self.mock_client.upsert.assert_called_once_with(
-            collection_name=self.collection_name,
-            points=[]
+        assert vector_db.client == mock_client
+        assert vector_db.collection_name == "test_collection"
+        mock_qdrant_client.assert_called_once_with(
+            url="http://localhost:6333",
+            api_key="test-key"
         )
 
-    def test_upsert_vectors_error(self):
-        """Test upsert_vectors when an error occurs"""
-        # Arrange
-        document_id = "doc123"
-        chunks = ["chunk1"]
-        embeddings = [[1.0, 2.0, 3.0]]
-        self.mock_client.upsert.side_effect = Exception("Upsert failed")
+
+def test_initialization_failure():
+    """Test VectorDatabaseManager initialization failure"""
+    # Arrange
+    with patch('app.core.vector_db.QdrantClient') as mock_qdrant_client:
+        mock_qdrant_client.side_effect = Exception("Connection failed")
         
         # Act & Assert
-        with pytest.raises(Exception, match="Error upserting vectors: Upsert failed"):
-            self.vector_db.upsert_vectors(document_id, chunks, embeddings)
-
-    def test_search_vectors_success(self):
-        """Test successful vector search"""
-        # Arrange
-        query_embedding = [1.0, 2.0, 3.0]
-        limit = 5
-        
-        # Mock search results
-        mock_hit1 = Mock()
-        mock_hit1.id = "hit1"
-        mock_hit1.score = 0.95
-        mock_hit1.payload = {
-            "text": "Found text 1",
-            "document_id": "doc1",
-            "chunk_index": 0
-        }
-        
-        mock_hit2 = Mock()
-        mock_hit2.id = "hit2"
-        mock_hit2.score = 0.85
-        mock_hit2.payload = {
-            "text": "Found text 2",
-            "document_id": "doc2",
-            "chunk_index": 1
-        }
-        
-        self.mock_client.search.return_value = [mock_hit1, mock_hit2]
-        
-        # Act
-        result = self.vector_db.search_vectors(query_embedding, limit)
-        
-        # Assert
-        expected_result = [
-            {
-                "text": "Found text 1",
-                "document_id": "doc1",
-                "chunk_index": 0,
-                "score": 0.95
-            },
-            {
-                "text": "Found text 2",
-                "document_id": "doc2",
-                "chunk_index": 1,
-                "score": 0.85
-            }
-        ]
-        assert result == expected_result
-        self.mock_client.search.assert_called_once_with(
-            collection_name=self.collection_name,
-            query_vector=query_embedding,
-            limit=limit
-        )
+        with pytest.raises(Exception, match="Error initializing Qdrant client: Connection failed"):
+            VectorDatabaseManager(
+                qdrant_url="invalid-url",
+                qdrant_api_key="invalid-key",
+                collection_name="test_collection"
+            )
 
-    def test_search_vectors_default_limit(self):
-        """Test vector search with default limit"""
-        # Arrange
-        query_embedding = [1.0, 2.0, 3.0]
-        self.mock_client.search.return_value = []
-        
-        # Act
-        result = self.vector_db.search_vectors(query_embedding)
-        
-        # Assert
-        assert result == []
-        self.mock_client.search.assert_called_once_with(
-            collection_name=self.collection_name,
-            query_vector=query_embedding,
-            limit=5  # Default limit
-        )
 
-    def test_search_vectors_missing_payload(self):
-        """Test vector search with missing payload data"""
-        # Arrange
-        query_embedding = [1.0, 2.0, 3.0]
-        
-        # Mock search results with invalid payloads
-        mock_hit1 = Mock()
-        mock_hit1.id = "hit1"
-        mock_hit1.score = 0.95
-        mock_hit1.payload = None  # Missing payload
-        
-        mock_hit2 = Mock()
-        mock_hit2.id = "hit2"
-        mock_hit2.score = 0.85
-        mock_hit2.payload = {
-            "text": "Found text 2",
-            # Missing document_id and chunk_index
-        }
-        
-        mock_hit3 = Mock()
-        mock_hit3.id = "hit3"
-        mock_hit3.score = 0.75
-        mock_hit3.payload = {
-            "text": "Found text 3",
-            "document_id": "doc3",
-            "chunk_index": 2
+def test_create_collection_new_collection(vector_db):
+    """Test creating a new collection that doesn't exist"""
+    # Arrange
+    mock_collections_response = SimpleNamespace(collections=[])
+    vector_db.client.get_collections.return_value = mock_collections_response
+    
+    # Act
+    result = vector_db.create_collection()
+    
+    # Assert
+    assert result == {"message": f"Collection {COLLECTION_NAME} created or already exists"}
+    vector_db.client.get_collections.assert_called_once()
+    vector_db.client.create_collection.assert_called_once()
+
+
+def test_create_collection_existing_collection(vector_db):
+    """Test creating a collection that already exists"""
+    # Arrange
+    mock_collection = SimpleNamespace(name=COLLECTION_NAME)
+    mock_collections_response = SimpleNamespace(collections=[mock_collection])
+    vector_db.client.get_collections.return_value = mock_collections_response
+    
+    # Act
+    result = vector_db.create_collection()
+    
+    # Assert
+    assert result == {"message": f"Collection {COLLECTION_NAME} created or already exists"}
+    vector_db.client.get_collections.assert_called_once()
+    vector_db.client.create_collection.assert_not_called()
+
+
+def test_create_collection_error(vector_db):
+    """Test create_collection when an error occurs"""
+    # Arrange
+    vector_db.client.get_collections.side_effect = Exception("Database error")
+    
+    # Act & Assert
+    with pytest.raises(Exception, match="Error creating collection: Database error"):
+        vector_db.create_collection()
+
+
+def test_delete_collection_success(vector_db):
+    """Test successful collection deletion"""
+    # Arrange
+    vector_db.client.delete_collection.return_value = None
+    
+    # Act
+    result = vector_db.delete_collection()
+    
+    # Assert
+    assert result == {"message": f"Collection {COLLECTION_NAME} deleted"}
+    vector_db.client.delete_collection.assert_called_once_with(
+        collection_name=COLLECTION_NAME
+    )
+
+
+def test_delete_collection_error(vector_db):
+    """Test delete_collection when an error occurs"""
+    # Arrange
+    vector_db.client.delete_collection.side_effect = Exception("Delete failed")
+    
+    # Act & Assert
+    with pytest.raises(Exception, match="Error deleting collection: Delete failed"):
+        vector_db.delete_collection()
+
+
+def test_list_collections_success(vector_db):
+    """Test successful collection listing"""
+    # Arrange
+    mock_collection1 = SimpleNamespace(name="collection1")
+    mock_collection2 = SimpleNamespace(name="collection2")
+    
+    mock_collections_response = SimpleNamespace(collections=[mock_collection1, mock_collection2])
+    vector_db.client.get_collections.return_value = mock_collections_response
+    
+    # Act
+    result = vector_db.list_collections()
+    
+    # Assert
+    assert result == ["collection1", "collection2"]
+    vector_db.client.get_collections.assert_called_once()
+
+
+def test_list_collections_empty(vector_db):
+    """Test listing collections when no collections exist"""
+    # Arrange
+    mock_collections_response = SimpleNamespace(collections=[])
+    vector_db.client.get_collections.return_value = mock_collections_response
+    
+    # Act
+    result = vector_db.list_collections()
+    
+    # Assert
+    assert result == []
+    vector_db.client.get_collections.assert_called_once()
+
+
+def test_list_collections_error(vector_db):
+    """Test list_collections when an error occurs"""
+    # Arrange
+    vector_db.client.get_collections.side_effect = Exception("List failed")
+    
+    # Act & Assert
+    with pytest.raises(Exception, match="Error listing collections: List failed"):
+        vector_db.list_collections()
+
+
+def test_upsert_vectors_success(vector_db, patched_point_struct, patched_uuid):
+    """Test successful vector upserting"""
+    # Arrange
+    document_id = "doc123"
+    chunks = ["chunk1", "chunk2"]
+    embeddings = list(_EMBS_2)
+    
+    # Mock UUID generation
+    patched_uuid.side_effect = ["uuid1", "uuid2"]
+    
+    # Mock PointStruct creation
+    mock_point1 = Mock()
+    mock_point2 = Mock()
+    patched_point_struct.side_effect = [mock_point1, mock_point2]
+    
+    # Act
+    result = vector_db.upsert_vectors(document_id, chunks, embeddings)
+    
+    # Assert
+    assert result == {"message": f"Upserted 2 points for document {document_id}"}
+    assert patched_point_struct.call_count == 2
+    
+    # Timestamp is generated inside upsert_vectors, so only check it is present
+    def _payload(chunk_index, text):
+        return {
+            "document_id": document_id,
+            "document_name": None,
+            "storage_path": None,
+            "chunk_index": chunk_index,
+            "text": text,
+            "upload_timestamp": ANY,
         }
-        
-        self.mock_client.search.return_value = [mock_hit1, mock_hit2, mock_hit3]
-        
-        # Act
-        result = self.vector_db.search_vectors(query_embedding)
-        
-        # Assert
-        # Only the third hit should be returned (valid payload)
-        expected_result = [
-            {
-                "text": "Found text 3",
-                "document_id": "doc3",
-                "chunk_index": 2,
-                "score": 0.75
-            }
-        ]
-        assert result == expected_result
-
-    def test_search_vectors_no_results(self):
-        """Test vector search with no results"""
-        # Arrange
-        query_embedding = [1.0, 2.0, 3.0]
-        self.mock_client.search.return_value = []
-        
-        # Act
-        result = self.vector_db.search_vectors(query_embedding)
-        
-        # Assert
-        assert result == []
+    assert patched_point_struct.call_args_list == [
+        call(id="uuid1", vector=_EMBS_2[0], payload=_payload(0, "chunk1")),
+        call(id="uuid2", vector=_EMBS_2[1], payload=_payload(1, "chunk2")),
+    ]
+    
+    vector_db.client.upsert.assert_called_once_with(
+        collection_name=COLLECTION_NAME,
+        points=[mock_point1, mock_point2]
+    )
 
-    def test_search_vectors_error(self):
-        """Test search_vectors when an error occurs"""
-        # Arrange
-        query_embedding = [1.0, 2.0, 3.0]
-        self.mock_client.search.side_effect = Exception("Search failed")
-        
-        # Act & Assert
-        with pytest.raises(Exception, match="Error searching vectors: Search failed"):
-            self.vector_db.search_vectors(query_embedding)
 
-    def test_collection_name_property(self):
-        """Test that collection name is properly set"""
-        # Assert
-        assert self.vector_db.collection_name == self.collection_name
+def test_upsert_vectors_empty_data(vector_db):
+    """Test upserting with empty chunks and embeddings"""
+    # Arrange
+    document_id = "doc123"
+    chunks = []
+    embeddings = []
+    
+    # Act
+    result = vector_db.upsert_vectors(document_id, chunks, embeddings)
+    
+    # Assert
+    assert result == {"message": f"Upserted 0 points for document {document_id}"}
+    vector_db.client.upsert.assert_called_once_with(
+        collection_name=COLLECTION_NAME,
+        points=[]
+    )
 
-    def test_client_property(self):
-        """Test that client is properly set"""
-        # Assert
-        assert self.vector_db.client == self.mock_client
-
-    @patch('app.core.vector_db.models.VectorParams')
-    @patch('app.core.vector_db.models.Distance')
-    def test_create_collection_vector_params(self, mock_distance, mock_vector_params):
-        """Test that create_collection uses correct vector parameters"""
-        # Arrange
-        mock_collections_response = Mock()
-        mock_collections_response.collections = []
-        self.mock_client.get_collections.return_value = mock_collections_response
-        
-        mock_vector_config = Mock()
-        mock_vector_params.return_value = mock_vector_config
-        mock_distance.COSINE = "Cosine"
-        
-        # Act
-        self.vector_db.create_collection()
-        
-        # Assert
-        mock_vector_params.assert_called_once_with(size=768, distance="Cosine")
-
-    def test_upsert_vectors_mismatched_lengths(self):
-        """Test upsert_vectors with mismatched chunks and embeddings lengths"""
-        # Arrange
-        document_id = "doc123"
-        chunks = ["chunk1", "chunk2"]
-        embeddings = [[1.0, 2.0, 3.0]]  # Only one embedding for two chunks
-        
-        # Act & Assert
-        # The zip function will only process pairs up to the shortest list
-        # So this should process only one point
-        with patch('app.core.vector_db.uuid.uuid4', return_value="uuid1"), \
-             patch('app.core.vector_db.models.PointStruct') as mock_point_struct:
-            
-            mock_point = Mock()
-            mock_point_struct.return_value = mock_point
-            
-            result = self.vector_db.upsert_vectors(document_id, chunks, embeddings)
-            
-            assert result == {"message": f"Upserted 1 points for document {document_id}"}
-            assert mock_point_struct.call_count == 1
-
-    def test_search_vectors_all_invalid_payloads(self):
-        """Test vector search when all results have invalid payloads"""
-        # Arrange
-        query_embedding = [1.0, 2.0, 3.0]
-        
-        # Mock search results with all invalid payloads
-        mock_hit1 = Mock()
-        mock_hit1.id = "hit1"
-        mock_hit1.payload = None
-        
-        mock_hit2 = Mock()
-        mock_hit2.id = "hit2"
-        mock_hit2.payload = {"text": "incomplete"}  # Missing required fields
-        
-        self.mock_client.search.return_value = [mock_hit1, mock_hit2]
-        
-        # Act
-        result = self.vector_db.search_vectors(query_embedding)
-        
-        # Assert
-        assert result == []  # Should return empty list when no valid results
-
-    def test_integration_workflow(self):
-        """Test a complete workflow: create collection, upsert vectors, search"""
-        # Arrange
-        mock_collections_response = Mock()
-        mock_collections_response.collections = []
-        self.mock_client.get_collections.return_value = mock_collections_response
-        
-        # Mock search result
-        mock_hit = Mock()
-        mock_hit.id = "hit1"
-        mock_hit.score = 0.95
-        mock_hit.payload = {
+
+def test_upsert_vectors_error(vector_db):
+    """Test upsert_vectors when an error occurs"""
+    # Arrange
+    document_id = "doc123"
+    chunks = ["chunk1"]
+    embeddings = [list(_Q3)]
+    vector_db.client.upsert.side_effect = Exception("Upsert failed")
+    
+    # Act & Assert
+    with pytest.raises(Exception, match="Error upserting vectors: Upsert failed"):
+        vector_db.upsert_vectors(document_id, chunks, embeddings)
+
+
+@pytest.mark.parametrize("hits,kwargs,expected", [
+    pytest.param(
+        [
+            SimpleNamespace(id="hit1", score=0.95, payload={"text": "Found text 1", "document_id": "doc1", "chunk_index": 0}),
+            SimpleNamespace(id="hit2", score=0.85, payload={"text": "Found text 2", "document_id": "doc2", "chunk_index": 1}),
+        ],
+        {"limit": 5},
+        [
+            {"text": "Found text 1", "document_id": "doc1", "chunk_index": 0, "score": 0.95},
+            {"text": "Found text 2", "document_id": "doc2", "chunk_index": 1, "score": 0.85},
+        ],
+        id="success",
+    ),
+    pytest.param([], {}, [], id="default_limit_no_results"),
+    pytest.param(
+        [
+            SimpleNamespace(id="hit1", score=0.95, payload=None),  # Missing payload
+            SimpleNamespace(id="hit2", score=0.85, payload={"text": "Found text 2"}),  # Missing document_id and chunk_index
+            SimpleNamespace(id="hit3", score=0.75, payload={"text": "Found text 3", "document_id": "doc3", "chunk_index": 2}),
+        ],
+        {},
+        [{"text": "Found text 3", "document_id": "doc3", "chunk_index": 2, "score": 0.75}],
+        id="missing_payload",
+    ),
+    pytest.param(
+        [
+            SimpleNamespace(id="hit1", payload=None),
+            SimpleNamespace(id="hit2", payload={"text": "incomplete"}),  # Missing required fields
+        ],
+        {},
+        [],
+        id="all_invalid_payloads",
+    ),
+])
+def test_search_vectors(vector_db, hits, kwargs, expected):
+    """Test vector search keeps only hits with complete payloads"""
+    # Arrange
+    query_embedding = list(_Q3)
+    vector_db.client.search.return_value = hits
+    
+    # Act
+    result = vector_db.search_vectors(query_embedding, **kwargs)
+    
+    # Assert
+    assert result == expected
+    vector_db.client.search.assert_called_once_with(
+        collection_name=COLLECTION_NAME,
+        query_vector=query_embedding,
+        limit=kwargs.get("limit", 5)  # Default limit
+    )
+
+
+def test_search_vectors_error(vector_db):
+    """Test search_vectors when an error occurs"""
+    # Arrange
+    query_embedding = list(_Q3)
+    vector_db.client.search.side_effect = Exception("Search failed")
+    
+    # Act & Assert
+    with pytest.raises(Exception, match="Error searching vectors: Search failed"):
+        vector_db.search_vectors(query_embedding)
+
+
+def test_create_collection_vector_params(vector_db, patched_distance, patched_vector_params):
+    """Test that create_collection uses correct vector parameters"""
+    # Arrange
+    mock_collections_response = SimpleNamespace(collections=[])
+    vector_db.client.get_collections.return_value = mock_collections_response
+    
+    mock_vector_config = Mock()
+    patched_vector_params.return_value = mock_vector_config
+    patched_distance.COSINE = "Cosine"
+    
+    # Act
+    vector_db.create_collection()
+    
+    # Assert
+    patched_vector_params.assert_called_once_with(size=768, distance="Cosine")
+
+
+def _upsert_with_mocks(vector_db, patched_uuid, patched_point_struct, document_id, chunks, embeddings):
+    """Run upsert_vectors with a fixed uuid and a stand-in PointStruct"""
+    patched_uuid.return_value = "uuid1"
+    patched_point_struct.return_value = Mock()
+    return vector_db.upsert_vectors(document_id, chunks, embeddings)
+
+
+def test_upsert_vectors_mismatched_lengths(vector_db, patched_point_struct, patched_uuid):
+    """Test upsert_vectors with mismatched chunks and embeddings lengths"""
+    # Arrange
+    document_id = "doc123"
+    chunks = ["chunk1", "chunk2"]
+    embeddings = [list(_Q3)]  # Only one embedding for two chunks
+    
+    # Act & Assert
+    # The zip function will only process pairs up to the shortest list
+    # So this should process only one point
+    result = _upsert_with_mocks(vector_db, patched_uuid, patched_point_struct, document_id, chunks, embeddings)
+    
+    assert result == {"message": f"Upserted 1 points for document {document_id}"}
+    assert patched_point_struct.call_count == 1
+
+
+def test_integration_workflow(vector_db, patched_point_struct, patched_uuid):
+    """Test a complete workflow: create collection, upsert vectors, search"""
+    # Arrange
+    mock_collections_response = SimpleNamespace(collections=[])
+    vector_db.client.get_collections.return_value = mock_collections_response
+    
+    # Mock search result
+    mock_hit = SimpleNamespace(
+        id="hit1",
+        score=0.95,
+        payload={
             "text": "Found text",
             "document_id": "doc1",
             "chunk_index": 0
         }
-        self.mock_client.search.return_value = [mock_hit]
-        
-        # Act
-        # 1. Create collection
-        create_result = self.vector_db.create_collection()
-        
-        # 2. Upsert vectors
-        with patch('app.core.vector_db.uuid.uuid4', return_value="uuid1"), \
-             patch('app.core.vector_db.models.PointStruct') as mock_point_struct:
-            mock_point = Mock()
-            mock_point_struct.return_value = mock_point
-            
-            upsert_result = self.vector_db.upsert_vectors(
-                "doc1", ["test text"], [[1.0, 2.0, 3.0]]
-            )
-        
-        # 3. Search vectors
-        search_result = self.vector_db.search_vectors([1.0, 2.0, 3.0])
-        
-        # Assert
-        assert create_result["message"] == f"Collection {self.collection_name} created or already exists"
-        assert upsert_result["message"] == "Upserted 1 points for document doc1"
-        assert len(search_result) == 1
-        assert search_result[0]["text"] == "Found text"
+    )
+    vector_db.client.search.return_value = [mock_hit]
+    
+    # Act
+    # 1. Create collection
+    create_result = vector_db.create_collection()
+    
+    # 2. Upsert vectors
+    upsert_result = _upsert_with_mocks(
+        vector_db, patched_uuid, patched_point_struct, "doc1", ["test text"], [list(_Q3)]
+    )
+    
+    # 3. Search vectors
+    search_result = vector_db.search_vectors(list(_Q3))
+    
+    # Assert
+    assert create_result["message"] == f"Collection {COLLECTION_NAME} created or already exists"
+    assert upsert_result["message"] == "Upserted 1 points for document doc1"
+    assert len(search_result) == 1
+    assert search_result[0]["text"] == "Found text"
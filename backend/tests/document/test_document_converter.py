@@ -1,99 +1,146 @@
 import pytest
 import io
 from unittest.mock import Mock, patch, mock_open
-from PyPDF2 import PdfReader
 
-from app.document_upload.document_converter import DocumentConverter
+from app.document_upload.document_converter import (
+    DocumentConverter,
+    DocumentExtractionError,
+    UnsupportedFileTypeError,
+    clear_extraction_cache,
+)
+
+
+def _mock_pdf_pages(mock_pdf_reader, page_texts):
+    """Point the patched PdfReader at mock pages returning page_texts; returns the pages"""
+    mock_pages = []
+    for page_text in page_texts:
+        mock_page = Mock()
+        mock_page.extract_text.return_value = page_text
+        mock_pages.append(mock_page)
+    mock_pdf_reader.return_value.pages = mock_pages
+    return mock_pages
 
 
 class TestDocumentConverter:
     """Test DocumentConverter class for text extraction from documents"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def document_converter(self):
-        """Create DocumentConverter instance"""
+        """Create one DocumentConverter for the module; it holds no state"""
         return DocumentConverter()
 
+    @pytest.fixture
+    def mock_pdf_reader(self, mocker):
+        """Patch PdfReader in the converter module for one test, with PyMuPDF disabled"""
+        mocker.patch('app.document_upload.document_converter.pymupdf', None)
+        return mocker.patch('app.document_upload.document_converter.PdfReader')
+
+    @pytest.fixture(autouse=True)
+    def _clear_extraction_cache(self):
+        """Tests reuse the same dummy content, so start each one with an empty cache"""
+        clear_extraction_cache()
+        yield
+        clear_extraction_cache()
+
     def test_init_success(self, document_converter):
         """Test successful initialization of DocumentConverter"""
         assert document_converter is not None
 
-    def test_extract_text_pdf_success(self, document_converter):
+    @pytest.mark.parametrize("page_texts,expected", [
+        pytest.param(["This is test text from PDF."], "This is test text from PDF.", id="single_page"),
+        pytest.param(["Page 1 text. ", "Page 2 text."], "Page 1 text. Page 2 text.", id="multiple_pages"),
+        pytest.param(["Valid text. ", None], "Valid text.", id="empty_page"),  # Text is cleaned/normalized
+    ])
+    def test_extract_text_pdf_success(self, document_converter, mock_pdf_reader, page_texts, expected):
         """Test successful text extraction from PDF"""
         # Arrange
-        mock_pdf_content = b"dummy pdf content"
-        mock_page = Mock()
-        mock_page.extract_text.return_value = "This is test text from PDF."
+        _mock_pdf_pages(mock_pdf_reader, page_texts)
         
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_reader_instance = Mock()
-            mock_reader_instance.pages = [mock_page]
-            mock_pdf_reader.return_value = mock_reader_instance
-            
-            # Act
-            result = document_converter.extract_text(mock_pdf_content, "application/pdf")
-            
-            # Assert
-            assert result == "This is test text from PDF."
-            mock_pdf_reader.assert_called_once()
+        # Act
+        result = document_converter.extract_text(b"dummy pdf content", "application/pdf")
+        
+        # Assert
+        assert result == expected
+        mock_pdf_reader.assert_called_once()
 
-    def test_extract_text_pdf_multiple_pages(self, document_converter):
-        """Test text extraction from PDF with multiple pages"""
+    @pytest.mark.parametrize("page_texts,message", [
+        pytest.param([None, ""], "This PDF appears to be image-based or contains no extractable text", id="all_empty_pages"),
+        pytest.param(["  \n  "], "image-based or contains no extractable text", id="minimal_content"),  # Only whitespace
+        pytest.param([], "PDF file appears to be empty or corrupted", id="no_pages"),
+    ])
+    def test_extract_text_pdf_no_text(self, document_converter, mock_pdf_reader, page_texts, message):
+        """Test PDFs without extractable text (empty, image-based or corrupted)"""
         # Arrange
-        mock_pdf_content = b"dummy pdf content"
-        mock_page1 = Mock()
-        mock_page1.extract_text.return_value = "Page 1 text. "
-        mock_page2 = Mock()
-        mock_page2.extract_text.return_value = "Page 2 text."
-        
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_reader_instance = Mock()
-            mock_reader_instance.pages = [mock_page1, mock_page2]
-            mock_pdf_reader.return_value = mock_reader_instance
-            
-            # Act
-            result = document_converter.extract_text(mock_pdf_content, "application/pdf")
-            
-            # Assert
-            assert result == "Page 1 text. Page 2 text."
+        _mock_pdf_pages(mock_pdf_reader, page_texts)
+        
+        # Act & Assert
+        with pytest.raises(ValueError, match=message):
+            document_converter.extract_text(b"dummy pdf content", "application/pdf")
+
+    def test_extract_text_pdf_pymupdf_backend(self, document_converter, mocker):
+        """Test that a real PDF is read with PyMuPDF when it is available"""
+        # Arrange
+        pymupdf = pytest.importorskip("pymupdf")
+        doc = pymupdf.open()
+        for page_num in range(1, 3):
+            doc.new_page().insert_text((72, 72), f"Page {page_num} text.")
+        pdf_content = doc.tobytes()
+        mock_pdf_reader = mocker.patch('app.document_upload.document_converter.PdfReader')
+        
+        # Act
+        result = document_converter.extract_text(pdf_content, "application/pdf")
+        
+        # Assert
+        assert result == "Page 1 text. Page 2 text."
+        mock_pdf_reader.assert_not_called()
 
-    def test_extract_text_pdf_empty_page(self, document_converter):
-        """Test text extraction from PDF with empty page"""
+    def test_extract_text_pdf_pymupdf_fallback(self, document_converter, mocker):
+        """Test that pypdf is used when PyMuPDF can't open the PDF"""
         # Arrange
         mock_pdf_content = b"dummy pdf content"
-        mock_page1 = Mock()
-        mock_page1.extract_text.return_value = "Valid text. "
-        mock_page2 = Mock()
-        mock_page2.extract_text.return_value = None  # Empty page
-        
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_reader_instance = Mock()
-            mock_reader_instance.pages = [mock_page1, mock_page2]
-            mock_pdf_reader.return_value = mock_reader_instance
-            
-            # Act
-            result = document_converter.extract_text(mock_pdf_content, "application/pdf")
-            
-            # Assert - text is now cleaned/normalized
-            assert result == "Valid text."
+        mock_pymupdf = mocker.patch('app.document_upload.document_converter.pymupdf')
+        mock_pymupdf.open.side_effect = Exception("Failed to open stream")
+        mock_pdf_reader = mocker.patch('app.document_upload.document_converter.PdfReader')
+        _mock_pdf_pages(mock_pdf_reader, ["This is test text from PDF."])
+        
+        # Act
+        result = document_converter.extract_text(mock_pdf_content, "application/pdf")
+        
+        # Assert
+        assert result == "This is test text from PDF."
+        mock_pymupdf.open.assert_called_once()
+        mock_pdf_reader.assert_called_once()
 
-    def test_extract_text_pdf_all_empty_pages(self, document_converter):
-        """Test text extraction from PDF with all empty pages"""
+    def test_extract_text_cache_hit(self, document_converter, mock_pdf_reader):
+        """Test that identical content is only parsed once"""
         # Arrange
         mock_pdf_content = b"dummy pdf content"
-        mock_page1 = Mock()
-        mock_page1.extract_text.return_value = None
-        mock_page2 = Mock()
-        mock_page2.extract_text.return_value = ""
-        
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_reader_instance = Mock()
-            mock_reader_instance.pages = [mock_page1, mock_page2]
-            mock_pdf_reader.return_value = mock_reader_instance
-            
-            # Act & Assert - should raise ValueError for empty content
-            with pytest.raises(ValueError, match="This PDF appears to be image-based or contains no extractable text"):
-                document_converter.extract_text(mock_pdf_content, "application/pdf")
+        _mock_pdf_pages(mock_pdf_reader, ["This is test text from PDF."])
+        
+        # Act
+        first = document_converter.extract_text(mock_pdf_content, "application/pdf")
+        second = document_converter.extract_text(mock_pdf_content, "application/pdf")
+        
+        # Assert
+        assert first == second == "This is test text from PDF."
+        mock_pdf_reader.assert_called_once()
+
+    def test_extract_text_cache_evicts_past_char_budget(self, document_converter, mocker):
+        """Test that the cache evicts the oldest texts once their total size passes the budget"""
+        # Arrange
+        mocker.patch('app.document_upload.document_converter.EXTRACTION_CACHE_MAX_CHARS', 25)
+        extractor = Mock(side_effect=lambda converter, content: content.decode("utf-8"))
+        mocker.patch.dict(DocumentConverter._EXTRACTORS, {"text/plain": extractor})
+        first, second = b"first document text", b"second document text"
+        
+        # Act
+        document_converter.extract_text(first, "text/plain")
+        document_converter.extract_text(second, "text/plain")  # 19 + 20 chars > 25, so first goes
+        document_converter.extract_text(second, "text/plain")
+        document_converter.extract_text(first, "text/plain")
+        
+        # Assert - only the evicted text is extracted again
+        assert [call.args[1] for call in extractor.call_args_list] == [first, second, first]
 
     def test_extract_text_text_plain_success(self, document_converter):
         """Test successful text extraction from plain text"""
@@ -126,27 +173,30 @@ class TestDocumentConverter:
         with pytest.raises(ValueError, match="Text file appears to be empty"):
             document_converter.extract_text(text_content, "text/plain")
 
-    def test_extract_text_unsupported_file_type(self, document_converter):
+    @patch('app.document_upload.document_converter.logger')
+    def test_extract_text_unsupported_file_type(self, mock_logger, document_converter):
         """Test extraction with unsupported file type"""
         # Arrange
         content = b"some content"
         
         # Act & Assert - should raise ValueError for unsupported file type
-        with pytest.raises(ValueError, match="Unsupported file type: application/msword"):
+        with pytest.raises(UnsupportedFileTypeError, match="Unsupported file type: application/msword"):
             document_converter.extract_text(content, "application/msword")
+        
+        # Known-unsupported types are rejected up front, not logged as errors
+        mock_logger.error.assert_not_called()
 
-    def test_extract_text_pdf_reader_exception(self, document_converter):
+    def test_extract_text_pdf_reader_exception(self, document_converter, mock_pdf_reader):
         """Test PDF extraction with PdfReader exception"""
         # Arrange
         mock_pdf_content = b"corrupted pdf content"
         
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_pdf_reader.side_effect = Exception("Corrupted PDF file")
-            
-            # Act & Assert
-            with pytest.raises(Exception) as exc_info:
-                document_converter.extract_text(mock_pdf_content, "application/pdf")
-            assert "Error extracting text: Corrupted PDF file" in str(exc_info.value)
+        mock_pdf_reader.side_effect = Exception("Corrupted PDF file")
+        
+        # Act & Assert
+        with pytest.raises(DocumentExtractionError) as exc_info:
+            document_converter.extract_text(mock_pdf_content, "application/pdf")
+        assert "Error extracting text: Corrupted PDF file" in str(exc_info.value)
 
     def test_extract_text_plain_text_decode_exception(self, document_converter):
         """Test plain text extraction with decode exception"""
@@ -160,50 +210,34 @@ class TestDocumentConverter:
         # Assert - should return the decoded content
         assert result == "ÿþ\x00\x00"
 
-    def test_extract_text_pdf_io_exception(self, document_converter):
+    def test_extract_text_pdf_io_exception(self, document_converter, mock_pdf_reader):
         """Test PDF extraction with IO exception"""
         # Arrange
         mock_pdf_content = b"dummy pdf content"
+        mock_pdf_reader.side_effect = OSError("IO Error")
         
-        with patch('app.document_upload.document_converter.io.BytesIO') as mock_bytesio:
-            mock_bytesio.side_effect = Exception("IO Error")
-            
-            # Act & Assert
-            with pytest.raises(Exception) as exc_info:
-                document_converter.extract_text(mock_pdf_content, "application/pdf")
-            assert "Error extracting text: IO Error" in str(exc_info.value)
-
-    def test_extract_text_pdf_no_pages(self, document_converter):
-        """Test PDF extraction with no pages"""
-        # Arrange
-        mock_pdf_content = b"dummy pdf content"
-        
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_reader_instance = Mock()
-            mock_reader_instance.pages = []  # No pages
-            mock_pdf_reader.return_value = mock_reader_instance
-            
-            # Act & Assert - should raise ValueError for empty PDF
-            with pytest.raises(ValueError, match="PDF file appears to be empty or corrupted"):
-                document_converter.extract_text(mock_pdf_content, "application/pdf")
+        # Act & Assert
+        with pytest.raises(DocumentExtractionError) as exc_info:
+            document_converter.extract_text(mock_pdf_content, "application/pdf")
+        assert "Error extracting text: IO Error" in str(exc_info.value)
+        mock_pdf_reader.assert_called_once()
 
     @patch('app.document_upload.document_converter.logger')
-    def test_extract_text_logs_error(self, mock_logger, document_converter):
+    def test_extract_text_logs_error(self, mock_logger, document_converter, mock_pdf_reader):
         """Test that errors are properly logged"""
         # Arrange
         content = b"some content"
         
         # Mock an internal exception that would be logged
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_pdf_reader.side_effect = Exception("Internal error")
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError):
-                document_converter.extract_text(content, "application/pdf")
-            
-            mock_logger.error.assert_called_once()
-            error_message = mock_logger.error.call_args[0][0]
-            assert "Error extracting text from document:" in error_message
+        mock_pdf_reader.side_effect = Exception("Internal error")
+        
+        # Act & Assert
+        with pytest.raises(DocumentExtractionError):
+            document_converter.extract_text(content, "application/pdf")
+        
+        mock_logger.error.assert_called_once()
+        error_message = mock_logger.error.call_args[0][0]
+        assert "Error extracting text from document:" in error_message
 
     def test_extract_text_case_sensitivity(self, document_converter):
         """Test file type case sensitivity"""
@@ -217,40 +251,6 @@ class TestDocumentConverter:
         with pytest.raises(ValueError, match="Unsupported file type: Application/PDF"):
             document_converter.extract_text(text_content, "Application/PDF")
 
-    def test_extract_text_pdf_minimal_content(self, document_converter):
-        """Test PDF with minimal extractable text (image-based PDF scenario)"""
-        # Arrange
-        mock_pdf_content = b"dummy pdf content"
-        mock_page = Mock()
-        mock_page.extract_text.return_value = "  \n  "  # Only whitespace
-        
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_reader_instance = Mock()
-            mock_reader_instance.pages = [mock_page]
-            mock_pdf_reader.return_value = mock_reader_instance
-            
-            # Act & Assert
-            with pytest.raises(ValueError) as exc_info:
-                document_converter.extract_text(mock_pdf_content, "application/pdf")
-            
-            assert "image-based or contains no extractable text" in str(exc_info.value)
-
-    def test_extract_text_pdf_empty_pages(self, document_converter):
-        """Test PDF with no pages"""
-        # Arrange
-        mock_pdf_content = b"dummy pdf content"
-        
-        with patch('app.document_upload.document_converter.PdfReader') as mock_pdf_reader:
-            mock_reader_instance = Mock()
-            mock_reader_instance.pages = []  # No pages
-            mock_pdf_reader.return_value = mock_reader_instance
-            
-            # Act & Assert
-            with pytest.raises(ValueError) as exc_info:
-                document_converter.extract_text(mock_pdf_content, "application/pdf")
-            
-            assert "empty or corrupted" in str(exc_info.value)
-
     def test_extract_text_unicode_cleaning(self, document_converter):
         """Test Unicode character cleaning and surrogate handling"""
         # Arrange - text with Unicode surrogate characters
@@ -292,6 +292,16 @@ class TestDocumentConverter:
         assert "Hello" in result
         assert "World" in result
 
+    def test_clean_text_ascii_fast_path(self, document_converter):
+        """Test that ASCII text skips the translate table"""
+        # Arrange - a table entry that would strip "a" if translate ran
+        with patch.dict('app.document_upload.document_converter._CLEAN_TABLE', {ord("a"): None}):
+            # Act
+            result = document_converter._clean_text("a plain   ascii line")
+        
+        # Assert - whitespace is still normalized
+        assert result == "a plain ascii line"
+
     def test_extract_text_alternative_encodings(self, document_converter):
         """Test text extraction with alternative encodings"""
         # Arrange - content with latin1 encoding
@@ -1,42 +1,52 @@
+import math
+import numpy as np
 import pytest
+import random
+import threading
+import time
 from unittest.mock import Mock, patch
 
-from app.document_upload.embedding_generator import EmbeddingGenerator
+from google.api_core.exceptions import InvalidArgument, ResourceExhausted, ServiceUnavailable
+
+from app.document_upload.embedding_generator import EMBEDDING_MAX_ATTEMPTS, EmbeddingGenerator
 
 
 class TestEmbeddingGenerator:
     """Test EmbeddingGenerator class for generating text embeddings"""
 
-    def test_init_success(self):
-        """Test successful initialization of EmbeddingGenerator"""
+    @pytest.fixture
+    def mock_genai(self):
+        """Patch genai, give settings a test API key and skip retry backoff sleeps"""
         with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
+             patch('app.document_upload.embedding_generator.settings') as mock_settings, \
+             patch.object(EmbeddingGenerator._call_api.retry, 'sleep'):
             mock_settings.GEMINI_API_KEY = "test-api-key"
-            
-            # Act
-            generator = EmbeddingGenerator()
-            
-            # Assert
-            assert generator.api_key == "test-api-key"
-            assert generator.model_name == "models/embedding-001"
-            assert generator.task_type == "RETRIEVAL_DOCUMENT"
-            mock_genai.configure.assert_called_once_with(api_key="test-api-key")
+            yield mock_genai
+
+    @pytest.fixture
+    def generator(self, mock_genai):
+        """EmbeddingGenerator with default settings over the patched genai"""
+        return EmbeddingGenerator()
+
+    def test_init_success(self, mock_genai, generator):
+        """Test successful initialization of EmbeddingGenerator"""
+        # Assert
+        assert generator.api_key == "test-api-key"
+        assert generator.model_name == "models/embedding-001"
+        assert generator.task_type == "RETRIEVAL_DOCUMENT"
+        mock_genai.configure.assert_called_once_with(api_key="test-api-key")
 
-    def test_init_custom_parameters(self):
+    def test_init_custom_parameters(self, mock_genai):
         """Test initialization with custom parameters"""
-        with patch('app.document_upload.embedding_generator.genai'), \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            
-            # Act
-            generator = EmbeddingGenerator(
-                model_name="models/custom-embedding",
-                task_type="CUSTOM_TASK"
-            )
-            
-            # Assert
-            assert generator.model_name == "models/custom-embedding"
-            assert generator.task_type == "CUSTOM_TASK"
+        # Act
+        generator = EmbeddingGenerator(
+            model_name="models/custom-embedding",
+            task_type="CUSTOM_TASK"
+        )
+        
+        # Assert
+        assert generator.model_name == "models/custom-embedding"
+        assert generator.task_type == "CUSTOM_TASK"
 
     def test_init_missing_api_key(self):
         """Test initialization failure with missing API key"""
@@ -58,264 +68,421 @@ class TestEmbeddingGenerator:
                 EmbeddingGenerator()
             assert "Missing GEMINI_API_KEY in environment." in str(exc_info.value)
 
-    def test_init_genai_configure_exception(self):
+    def test_init_genai_configure_exception(self, mock_genai):
         """Test initialization failure with genai.configure exception"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_genai.configure.side_effect = Exception("API configuration error")
-            
-            # Act & Assert
-            with pytest.raises(Exception) as exc_info:
-                EmbeddingGenerator()
-            assert "API configuration error" in str(exc_info.value)
+        mock_genai.configure.side_effect = Exception("API configuration error")
+        
+        # Act & Assert
+        with pytest.raises(Exception) as exc_info:
+            EmbeddingGenerator()
+        assert "API configuration error" in str(exc_info.value)
 
-    def test_get_embedding_success(self):
+    def test_get_embedding_success(self, mock_genai, generator):
         """Test successful embedding generation"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"embedding": [0.1, 0.2, 0.3, 0.4, 0.5]}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act
-            result = generator.get_embedding("test text")
-            
-            # Assert
-            assert result == [0.1, 0.2, 0.3, 0.4, 0.5]
-            mock_genai.embed_content.assert_called_once_with(
-                model="models/embedding-001",
-                content="test text",
-                task_type="RETRIEVAL_DOCUMENT"
-            )
-
-    def test_get_embedding_custom_model(self):
+        mock_response = {"embedding": [0.1, 0.2, 0.3, 0.4, 0.5]}
+        mock_genai.embed_content.return_value = mock_response
+        
+        # Act
+        result = generator.get_embedding("test text")
+        
+        # Assert
+        assert result == [0.1, 0.2, 0.3, 0.4, 0.5]
+        mock_genai.embed_content.assert_called_once_with(
+            model="models/embedding-001",
+            content="test text",
+            task_type="RETRIEVAL_DOCUMENT"
+        )
+
+    def test_get_embedding_custom_model(self, mock_genai):
         """Test embedding generation with custom model"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"embedding": [0.1, 0.2, 0.3]}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator(
-                model_name="models/custom-embedding",
-                task_type="CUSTOM_TASK"
-            )
-            
-            # Act
-            result = generator.get_embedding("custom text")
-            
-            # Assert
-            assert result == [0.1, 0.2, 0.3]
-            mock_genai.embed_content.assert_called_once_with(
-                model="models/custom-embedding",
-                content="custom text",
-                task_type="CUSTOM_TASK"
-            )
-
-    def test_get_embedding_empty_text(self):
+        mock_response = {"embedding": [0.1, 0.2, 0.3]}
+        mock_genai.embed_content.return_value = mock_response
+        
+        generator = EmbeddingGenerator(
+            model_name="models/custom-embedding",
+            task_type="CUSTOM_TASK"
+        )
+        
+        # Act
+        result = generator.get_embedding("custom text")
+        
+        # Assert
+        assert result == [0.1, 0.2, 0.3]
+        mock_genai.embed_content.assert_called_once_with(
+            model="models/custom-embedding",
+            content="custom text",
+            task_type="CUSTOM_TASK"
+        )
+
+    def test_get_embedding_empty_text(self, mock_genai, generator):
         """Test embedding generation with empty text"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"embedding": [0.0, 0.0, 0.0]}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert - should raise RuntimeError for empty text
-            with pytest.raises(RuntimeError, match="Gemini embedding failed: Text is empty after sanitization"):
-                generator.get_embedding("")
+        mock_response = {"embedding": [0.0, 0.0, 0.0]}
+        mock_genai.embed_content.return_value = mock_response
+        
+        # Act & Assert - should raise RuntimeError for empty text
+        with pytest.raises(RuntimeError, match="Gemini embedding failed: Text is empty after sanitization"):
+            generator.get_embedding("")
 
-    def test_get_embedding_unicode_text(self):
+    def test_get_embedding_unicode_text(self, mock_genai, generator):
         """Test embedding generation with unicode text"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"embedding": [0.1, 0.2, 0.3]}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            unicode_text = "Unicode: 你好世界 🌍"
-            
-            # Act
-            result = generator.get_embedding(unicode_text)
-            
-            # Assert
-            assert result == [0.1, 0.2, 0.3]
+        mock_response = {"embedding": [0.1, 0.2, 0.3]}
+        mock_genai.embed_content.return_value = mock_response
+        
+        unicode_text = "Unicode: 你好世界 🌍"
+        
+        # Act
+        result = generator.get_embedding(unicode_text)
+        
+        # Assert
+        assert result == [0.1, 0.2, 0.3]
 
-    def test_get_embedding_no_embedding_in_response(self):
-        """Test embedding generation when response has no embedding"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"status": "success"}  # No embedding key
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed: Invalid embedding response from Gemini API" in str(exc_info.value)
+    @pytest.mark.parametrize("response,expected", [
+        pytest.param({"status": "success"}, "Invalid embedding response from Gemini API", id="no_embedding_in_response"),
+        pytest.param({"embedding": None}, "Invalid embedding response from Gemini API", id="null_embedding"),
+        pytest.param({"embedding": []}, "Invalid embedding response from Gemini API", id="empty_embedding"),
+        pytest.param({"embedding": "not a list"}, "Invalid embedding response from Gemini API",
+                     id="invalid_embedding_type"),
+        pytest.param(None, "", id="malformed_response"),  # No response
+    ])
+    def test_get_embedding_invalid_response(self, mock_genai, generator, response, expected):
+        """Test embedding generation when the API returns an unusable response"""
+        mock_genai.embed_content.return_value = response
+        
+        # Act & Assert
+        with pytest.raises(RuntimeError) as exc_info:
+            generator.get_embedding("test text")
+        assert f"Gemini embedding failed: {expected}" in str(exc_info.value)
 
-    def test_get_embedding_null_embedding(self):
-        """Test embedding generation when embedding is null"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"embedding": None}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed: Invalid embedding response from Gemini API" in str(exc_info.value)
+    @pytest.mark.parametrize("exc,expected,attempts", [
+        pytest.param(Exception("API Error"), "API Error", 1, id="api_exception"),
+        pytest.param(InvalidArgument("Bad request"), "400 Bad request", 1, id="invalid_argument"),
+        pytest.param(TimeoutError("Request timeout"), "Request timeout", EMBEDDING_MAX_ATTEMPTS, id="api_timeout"),
+        pytest.param(ConnectionError("Network error"), "Network error", EMBEDDING_MAX_ATTEMPTS,
+                     id="network_error"),
+    ])
+    def test_get_embedding_api_failure(self, mock_genai, generator, exc, expected, attempts):
+        """Test embedding generation when the API call keeps raising"""
+        mock_genai.embed_content.side_effect = exc
+        
+        # Act & Assert
+        with pytest.raises(RuntimeError) as exc_info:
+            generator.get_embedding("test text")
+        assert f"Gemini embedding failed: {expected}" in str(exc_info.value)
+        # Only transient errors are retried, and only up to the attempt limit
+        assert mock_genai.embed_content.call_count == attempts
 
-    def test_get_embedding_empty_embedding(self):
-        """Test embedding generation when embedding is empty list"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"embedding": []}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed: Invalid embedding response from Gemini API" in str(exc_info.value)
+    @pytest.mark.parametrize("exc", [
+        pytest.param(ConnectionError("flap"), id="connection_error"),
+        pytest.param(ServiceUnavailable("overloaded"), id="service_unavailable"),
+        pytest.param(ResourceExhausted("rate limited"), id="resource_exhausted"),
+    ])
+    def test_get_embedding_retries_transient_errors(self, mock_genai, generator, exc):
+        """Test embedding generation recovers when transient errors clear up"""
+        mock_genai.embed_content.side_effect = [exc, exc, {"embedding": [0.1, 0.2]}]
+        
+        # Act
+        result = generator.get_embedding("test text")
+        
+        # Assert
+        assert result == [0.1, 0.2]
+        assert mock_genai.embed_content.call_count == 3
 
-    def test_get_embedding_invalid_embedding_type(self):
-        """Test embedding generation when embedding is not a list"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {"embedding": "not a list"}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed: Invalid embedding response from Gemini API" in str(exc_info.value)
+    def test_get_embedding_response_with_extra_fields(self, mock_genai, generator):
+        """Test embedding generation with response containing extra fields"""
+        mock_response = {
+            "embedding": [0.1, 0.2, 0.3],
+            "model": "models/embedding-001",
+            "usage": {"input_tokens": 10},
+            "extra_field": "extra_value"
+        }
+        mock_genai.embed_content.return_value = mock_response
+        
+        # Act
+        result = generator.get_embedding("test text")
+        
+        # Assert
+        assert result == [0.1, 0.2, 0.3]  # Should extract only the embedding
 
-    def test_get_embedding_api_exception(self):
-        """Test embedding generation with API exception"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_genai.embed_content.side_effect = Exception("API Error")
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed: API Error" in str(exc_info.value)
+    def test_get_embedding_numeric_precision(self, mock_genai, generator):
+        """Test embedding generation with high precision numbers"""
+        high_precision_embedding = [0.123456789012345, -0.987654321098765, 0.0]
+        mock_response = {"embedding": high_precision_embedding}
+        mock_genai.embed_content.return_value = mock_response
+        
+        # Act
+        result = generator.get_embedding("test text")
+        
+        # Assert
+        assert result == high_precision_embedding
+        assert isinstance(result[0], float)
+        assert isinstance(result[1], float)
 
-    def test_get_embedding_api_timeout(self):
-        """Test embedding generation with API timeout"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_genai.embed_content.side_effect = TimeoutError("Request timeout")
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed: Request timeout" in str(exc_info.value)
+    def test_get_embedding_large_dimension(self, mock_genai, generator):
+        """Test embedding generation with large dimension embedding"""
+        large_embedding = [0.1] * 1536  # Common large embedding dimension
+        mock_response = {"embedding": large_embedding}
+        mock_genai.embed_content.return_value = mock_response
+        
+        # Act
+        result = generator.get_embedding("test text")
+        
+        # Assert
+        assert len(result) == 1536
+        assert np.allclose(result, 0.1, atol=1e-6)
 
-    def test_get_embedding_network_error(self):
-        """Test embedding generation with network error"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_genai.embed_content.side_effect = ConnectionError("Network error")
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed: Network error" in str(exc_info.value)
+    def test_get_embedding_float32_tolerance(self, mock_genai, tmp_path):
+        """Test that a large vector served from the float16 disk cache stays within tolerance"""
+        original = np.random.default_rng(0).uniform(-1.0, 1.0, 3072).tolist()
+        mock_genai.embed_content.return_value = {"embedding": original}
+        cache_path = str(tmp_path / "emb_cache.db")
+        with EmbeddingGenerator(cache_path=cache_path) as first:
+            first.get_embedding("test text")
+        
+        # Act - a fresh generator has an empty memory cache, so this reads emb_f16
+        with EmbeddingGenerator(cache_path=cache_path) as second:
+            cached = second.get_embedding("test text")
+        
+        # Assert
+        assert len(cached) == 3072
+        assert np.allclose(cached, original, rtol=0, atol=1e-3)
+        assert mock_genai.embed_content.call_count == 1
 
-    def test_get_embedding_malformed_response(self):
-        """Test embedding generation with malformed response"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_genai.embed_content.return_value = None  # No response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act & Assert
-            with pytest.raises(RuntimeError) as exc_info:
-                generator.get_embedding("test text")
-            assert "Gemini embedding failed:" in str(exc_info.value)
+    def test_get_embedding_cache_hit(self, mock_genai, generator):
+        """Test that repeated texts are embedded only once"""
+        mock_genai.embed_content.return_value = {"embedding": [0.1, 0.2, 0.3]}
+        
+        # Act
+        results = [generator.get_embedding("same") for _ in range(3)]
+        
+        # Assert
+        assert results[0] == results[1] == results[2] == [0.1, 0.2, 0.3]
+        assert mock_genai.embed_content.call_count == 1
 
-    def test_get_embedding_response_with_extra_fields(self):
-        """Test embedding generation with response containing extra fields"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            mock_response = {
-                "embedding": [0.1, 0.2, 0.3],
-                "model": "models/embedding-001",
-                "usage": {"input_tokens": 10},
-                "extra_field": "extra_value"
-            }
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act
-            result = generator.get_embedding("test text")
-            
-            # Assert
-            assert result == [0.1, 0.2, 0.3]  # Should extract only the embedding
+    def test_get_embedding_memory_cache_hit_is_exact(self, mock_genai, generator):
+        """Test that an in-memory cache hit returns exactly the first result"""
+        rng = random.Random(0)
+        original = [rng.uniform(-1.0, 1.0) for _ in range(768)]
+        mock_genai.embed_content.return_value = {"embedding": original}
+        
+        first = generator.get_embedding("exact text")
+        expected = list(first)
+        first.append(99.0)  # Callers mutating their result must not touch the cache
+        
+        # Act
+        cached = generator.get_embedding("exact text")
+        
+        # Assert
+        assert cached == expected
+        assert mock_genai.embed_content.call_count == 1
 
-    def test_get_embedding_numeric_precision(self):
-        """Test embedding generation with high precision numbers"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            high_precision_embedding = [0.123456789012345, -0.987654321098765, 0.0]
-            mock_response = {"embedding": high_precision_embedding}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act
-            result = generator.get_embedding("test text")
-            
-            # Assert
-            assert result == high_precision_embedding
-            assert isinstance(result[0], float)
-            assert isinstance(result[1], float)
+    def test_get_embedding_quantized_round_trip(self, mock_genai, tmp_path):
+        """Test that float16 disk storage keeps vectors nearly identical in direction"""
+        rng = random.Random(0)
+        original = [rng.uniform(-1.0, 1.0) for _ in range(768)]
+        mock_genai.embed_content.return_value = {"embedding": original}
+        cache_path = str(tmp_path / "emb_cache.db")
+        
+        with EmbeddingGenerator(cache_path=cache_path) as first:
+            first.get_embedding("quantized text")
+        
+        # Act
+        with EmbeddingGenerator(cache_path=cache_path) as second:
+            cached = second.get_embedding("quantized text")
+        
+        # Assert
+        dot = sum(a * b for a, b in zip(original, cached))
+        cosine = dot / (math.sqrt(sum(a * a for a in original)) * math.sqrt(sum(b * b for b in cached)))
+        assert cosine > 0.9999
+        assert mock_genai.embed_content.call_count == 1
 
-    def test_get_embedding_large_dimension(self):
-        """Test embedding generation with large dimension embedding"""
-        with patch('app.document_upload.embedding_generator.genai') as mock_genai, \
-             patch('app.document_upload.embedding_generator.settings') as mock_settings:
-            mock_settings.GEMINI_API_KEY = "test-api-key"
-            large_embedding = [0.1] * 1536  # Common large embedding dimension
-            mock_response = {"embedding": large_embedding}
-            mock_genai.embed_content.return_value = mock_response
-            
-            generator = EmbeddingGenerator()
-            
-            # Act
-            result = generator.get_embedding("test text")
-            
-            # Assert
-            assert len(result) == 1536
-            assert all(abs(val - 0.1) < 1e-6 for val in result)
+    def test_get_embedding_cache_distinct_keys(self, mock_genai, generator):
+        """Test that different texts are embedded separately"""
+        mock_genai.embed_content.return_value = {"embedding": [0.1, 0.2, 0.3]}
+        
+        # Act
+        generator.get_embedding("first")
+        generator.get_embedding("second")
+        
+        # Assert
+        assert mock_genai.embed_content.call_count == 2
+
+    def test_get_embedding_cache_lru_eviction(self, mock_genai):
+        """Test that the least recently used embedding is evicted once the cache is full"""
+        mock_genai.embed_content.return_value = {"embedding": [0.1, 0.2, 0.3]}
+        
+        generator = EmbeddingGenerator(cache_size=2)
+        
+        # Act
+        for text in ("a", "b", "a", "c"):  # "b" is least recently used when "c" arrives
+            generator.get_embedding(text)
+        generator.get_embedding("a")
+        generator.get_embedding("b")
+        
+        # Assert
+        contents = [call.kwargs["content"] for call in mock_genai.embed_content.call_args_list]
+        assert contents == ["a", "b", "c", "b"]
+
+    def test_cache_hit_on_compatibility_form(self, mock_genai, generator):
+        """Test that NFKC-equivalent texts reuse the cached vector"""
+        mock_genai.embed_content.return_value = {"embedding": [0.1, 0.2, 0.3]}
+        
+        # Act
+        generator.get_embedding("file")
+        generator.get_embedding("\ufb01le")  # "fi" ligature
+        
+        # Assert - the API only ever sees the original text
+        mock_genai.embed_content.assert_called_once_with(
+            model="models/embedding-001",
+            content="file",
+            task_type="RETRIEVAL_DOCUMENT"
+        )
+
+    @pytest.mark.parametrize("first,second", [
+        pytest.param("hello", "world", id="different_words"),
+        pytest.param("US", "us", id="case"),
+        pytest.param("Note:", "Note", id="trailing_punctuation"),
+    ])
+    def test_cache_miss_on_text_change(self, mock_genai, generator, first, second):
+        """Test that texts differing in words, case or punctuation get their own embeddings"""
+        mock_genai.embed_content.return_value = {"embedding": [0.1, 0.2, 0.3]}
+        
+        # Act
+        generator.get_embedding(first)
+        generator.get_embedding(second)
+        
+        # Assert
+        contents = [call.kwargs["content"] for call in mock_genai.embed_content.call_args_list]
+        assert contents == [first, second]
+
+    def test_get_embedding_sqlite_cache_persists_across_instances(self, mock_genai, tmp_path):
+        """Test that the on-disk cache serves a new generator without calling the API"""
+        mock_genai.embed_content.return_value = {"embedding": [0.5, -0.25, 1.0]}
+        cache_path = str(tmp_path / "emb_cache.db")
+        
+        with EmbeddingGenerator(cache_path=cache_path) as first:
+            first.get_embedding("persisted text")
+        
+        # Act
+        with EmbeddingGenerator(cache_path=cache_path) as second:
+            result = second.get_embedding("persisted text")
+        
+        # Assert
+        assert result == [0.5, -0.25, 1.0]  # exactly representable in float32
+        assert mock_genai.embed_content.call_count == 1
+
+    def test_close_releases_sqlite_cache(self, mock_genai, tmp_path):
+        """Test that closing the generator closes the disk cache but keeps the memory cache"""
+        mock_genai.embed_content.return_value = {"embedding": [0.5, -0.25, 1.0]}
+        generator = EmbeddingGenerator(cache_path=str(tmp_path / "emb_cache.db"))
+        generator.get_embedding("cached text")
+        
+        # Act
+        generator.close()
+        generator.close()  # Closing twice is harmless
+        
+        # Assert
+        assert generator._db is None
+        assert generator.get_embedding("cached text") == [0.5, -0.25, 1.0]
+        generator.get_embedding("new text")  # Misses skip the closed disk layer
+        assert mock_genai.embed_content.call_count == 2
+
+    def test_get_embeddings_batch_success(self, mock_genai, generator):
+        """Test embedding several texts with one batched API call"""
+        mock_genai.embed_content.return_value = {"embedding": [[0.1, 0.2], [0.3, 0.4]]}
+        
+        # Act
+        result = generator.get_embeddings(["first text", "second  text"])
+        
+        # Assert
+        assert result == [[0.1, 0.2], [0.3, 0.4]]
+        mock_genai.embed_content.assert_called_once_with(
+            model="models/embedding-001",
+            content=["first text", "second text"],
+            task_type="RETRIEVAL_DOCUMENT"
+        )
+
+    def test_get_embeddings_batch_chunks_over_limit(self, mock_genai, generator):
+        """Test that inputs above the batch limit are split across API calls"""
+        mock_genai.embed_content.side_effect = lambda content, **kwargs: {"embedding": [[0.1]] * len(content)}
+        
+        texts = [f"text {i}" for i in range(250)]
+        
+        # Act
+        result = generator.get_embeddings(texts)
+        
+        # Assert
+        assert len(result) == 250
+        batches = [call.kwargs["content"] for call in mock_genai.embed_content.call_args_list]
+        assert [len(batch) for batch in batches] == [100, 100, 50]
+        assert batches[2] == texts[200:]
+
+    def test_get_embeddings_preserves_order(self, mock_genai, generator):
+        """Test that returned vectors line up with the input texts"""
+        mock_genai.embed_content.side_effect = lambda content, **kwargs: {
+            "embedding": [[float(text.split()[1])] for text in content]
+        }
+        
+        texts = [f"text {i}" for i in range(150)]
+        
+        # Act
+        result = generator.get_embeddings(texts)
+        
+        # Assert
+        assert result == [[float(i)] for i in range(150)]
+
+    def test_get_embeddings_empty_text(self, mock_genai, generator):
+        """Test batch embedding rejects texts that are empty after sanitization"""
+        
+        # Act & Assert
+        with pytest.raises(RuntimeError, match="Gemini embedding failed: Text is empty after sanitization"):
+            generator.get_embeddings(["valid text", "   "])
+        mock_genai.embed_content.assert_not_called()
+
+    def test_get_embeddings_batch_retries_transient_errors(self, mock_genai, generator):
+        """Test a flaky batch call is retried rather than failing the whole batch"""
+        mock_genai.embed_content.side_effect = [
+            ConnectionError("flap"),
+            {"embedding": [[0.1], [0.2]]},
+        ]
+        
+        # Act
+        result = generator.get_embeddings(["a", "b"])
+        
+        # Assert
+        assert result == [[0.1], [0.2]]
+        assert mock_genai.embed_content.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_embeddings_concurrent_bounded_and_ordered(self, mock_genai, generator):
+        """Test concurrent batch embedding overlaps calls up to the limit and keeps input order"""
+        lock = threading.Lock()
+        in_flight = [0, 0]  # current, peak
+        
+        def slow_embed(content, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return {"embedding": [[float(text.split()[1])] for text in content]}
+        
+        mock_genai.embed_content.side_effect = slow_embed
+        texts = [f"text {i}" for i in range(12)]
+        
+        # Act
+        result = await generator.get_embeddings_concurrent(texts, batch_size=2, max_in_flight=3)
+        
+        # Assert - the peak shows calls overlapped without exceeding the limit
+        assert result == [[float(i)] for i in range(12)]
+        assert mock_genai.embed_content.call_count == 6
+        assert in_flight[1] == 3
+
+    @pytest.mark.asyncio
+    async def test_get_embeddings_concurrent_api_exception(self, mock_genai, generator):
+        """Test concurrent batch embedding surfaces API failures"""
+        mock_genai.embed_content.side_effect = Exception("API Error")
+        
+        # Act & Assert
+        with pytest.raises(RuntimeError, match="Gemini embedding failed: API Error"):
+            await generator.get_embeddings_concurrent(["a", "b", "c"], batch_size=1)
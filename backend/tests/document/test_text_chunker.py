@@ -7,9 +7,14 @@ from app.document_upload.text_chunker import TextChunker
 class TestTextChunker:
     """Test TextChunker class for text splitting with configurable chunk size and overlap"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def text_chunker(self):
-        """Create TextChunker instance with default parameters"""
+        """Create TextChunker instance with default parameters, shared by the module"""
+        return TextChunker()
+
+    @pytest.fixture
+    def fresh_chunker(self):
+        """Create a TextChunker with an empty cache for tests that observe caching"""
         return TextChunker()
 
     def test_init_default_parameters(self, text_chunker):
@@ -63,3 +68,35 @@ class TestTextChunker:
         assert len(chunks) >= 1
         for chunk in chunks:
             assert chunk == chunk.strip()
+
+    def test_chunk_text_cached_second_call_isolated(self, fresh_chunker):
+        """Test that a cached result is unaffected by callers mutating an earlier one"""
+        # Arrange
+        text = "Repeated document text. " * 100
+        first = fresh_chunker.chunk_text(text)
+        expected = list(first)
+        first.append("extra chunk")
+        first[0] = "edited"
+        
+        # Act
+        second = fresh_chunker.chunk_text(text)
+        
+        # Assert
+        assert second == expected
+        assert second is not first
+        assert len(fresh_chunker._cache) == 1
+
+    def test_chunk_text_cache_invalidates_on_param_change(self):
+        """Test that a different chunk size does not reuse another configuration's chunks"""
+        # Arrange
+        text = "This is a long text that needs to be chunked into smaller pieces."
+        chunker = TextChunker(chunk_size=10, overlap=3)
+        
+        # Act
+        small = chunker.chunk_text(text)
+        chunker.chunk_size = 1000
+        large = chunker.chunk_text(text)
+        
+        # Assert
+        assert len(small) > 1
+        assert large == [text]
@@ -0,0 +1,88 @@
+"""Fixtures for the end-to-end suite.
+
+Run in parallel with: pytest -n ${E2E_PARALLEL:-auto} -m e2e --dist=loadfile tests/e2e/
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import jwt
+import pytest
+from filelock import FileLock
+from tests.e2e.utils.get_firebase_token import TOKEN_EXPIRY_MARGIN_SECONDS, get_id_token
+from tests.e2e.utils.http_session import SESSION
+
+_E2E_DIR = Path(__file__).parent
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "e2e: mark as end-to-end")
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if _E2E_DIR in Path(item.fspath).parents:
+            item.add_marker(pytest.mark.e2e)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _close_http_session():
+    """Close the pooled connections shared by e2e helpers once the session ends."""
+    yield
+    SESSION.close()
+
+
+def _read_cached_token(token_path: Path):
+    """Return the token another worker cached in this run, or None if missing or near expiry."""
+    try:
+        cached = json.loads(token_path.read_text())
+    except (OSError, ValueError):
+        return None
+    if time.time() >= cached.get("exp", 0) - TOKEN_EXPIRY_MARGIN_SECONDS:
+        return None
+    return cached.get("idToken")
+
+
+@pytest.fixture(scope="session")
+def firebase_token(tmp_path_factory, worker_id):
+    """Sign the test user in once per run, sharing the token across xdist workers."""
+    email = os.getenv("FIREBASE_TEST_EMAIL")
+    password = os.getenv("FIREBASE_TEST_PASSWORD")
+    api_key = os.getenv("FIREBASE_API_KEY")
+    if worker_id == "master":
+        # Not under xdist: get_id_token's in-process cache is enough
+        return get_id_token(email, password, api_key)
+    
+    # The parent of the worker's basetemp is shared by all workers of this run only;
+    # the name is keyed on the project's API key and the user so no other credentials match
+    cache_id = hashlib.blake2b(f"{api_key}|{email}".encode("utf-8"), digest_size=8).hexdigest()
+    token_path = tmp_path_factory.getbasetemp().parent / f"fb_token_{cache_id}.json"
+    # Workers queue on the lock; the first fetches, the rest read its file
+    with FileLock(str(token_path) + ".lock"):
+        token = _read_cached_token(token_path)
+        if token:
+            return token
+        
+        token = get_id_token(email, password, api_key)
+        exp = jwt.decode(token, options={"verify_signature": False})["exp"]
+        # The file holds a live credential, so keep it private to the current user
+        fd = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"idToken": token, "exp": exp}, f)
+        return token
+
+
+@pytest.fixture(scope="session")
+def firebase_auth(firebase_token):
+    """The token with its uid and email claims, decoded once per session."""
+    # The backend verifies the signature; here we only need the claims
+    payload = jwt.decode(firebase_token, options={"verify_signature": False})
+    return {"token": firebase_token, "uid": payload["user_id"], "email": payload.get("email")}
+
+
+@pytest.fixture(scope="session")
+def auth_headers(firebase_token):
+    """Bearer headers for the signed-in test user."""
+    return {"Authorization": f"Bearer {firebase_token}"}
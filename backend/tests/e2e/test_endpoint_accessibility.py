@@ -5,68 +5,47 @@ Test script to verify profile endpoints are accessible
 import requests
 import json
 import pytest
+from tests.e2e.utils.http_session import SESSION
 
 BASE_URL = "http://localhost:8000"
 
-def test_profile_endpoints():
-    """Test if our profile endpoints are accessible"""
-    
-    # Test 1: Check if the API is running
+# Profile routes that must appear in the OpenAPI spec, with the methods each must allow
+EXPECTED_ENDPOINTS = [
+    ("/api/v1/user/profile", {"get", "put"}),
+    ("/api/v1/user/profile/avatar", {"put"}),
+]
+
+@pytest.fixture(scope="module")
+def openapi_paths():
+    """Fetch the OpenAPI spec once and share its paths across the module."""
     try:
-        response = requests.get(f"{BASE_URL}/docs")
-        print(f"✓ API is running - Status: {response.status_code}")
+        response = SESSION.get(f"{BASE_URL}/openapi.json", timeout=10)
     except requests.exceptions.ConnectionError:
-        print("✗ API is not accessible. Make sure Docker container is running.")
-        return
-    
-    # Test 2: Check if our endpoints appear in OpenAPI docs
-    try:
-        response = requests.get(f"{BASE_URL}/openapi.json")
-        if response.status_code == 200:
-            openapi_spec = response.json()
-            paths = openapi_spec.get("paths", {})
-            
-            # Check for our profile endpoints
-            profile_edit_path = "/api/v1/user/profile/edit"
-            profile_get_path = "/api/v1/user/profile"
-            
-            if profile_edit_path in paths:
-                print(f"✓ Profile edit endpoint found: {profile_edit_path}")
-                methods = list(paths[profile_edit_path].keys())
-                print(f"  Available methods: {methods}")
-            else:
-                print(f"✗ Profile edit endpoint not found: {profile_edit_path}")
-            
-            if profile_get_path in paths:
-                print(f"✓ Profile get endpoint found: {profile_get_path}")
-                methods = list(paths[profile_get_path].keys())
-                print(f"  Available methods: {methods}")
-            else:
-                print(f"✗ Profile get endpoint not found: {profile_get_path}")
-                
-        else:
-            print(f"✗ Could not fetch OpenAPI spec - Status: {response.status_code}")
-            
-    except Exception as e:
-        print(f"✗ Error checking OpenAPI spec: {e}")
+        pytest.skip("API is not accessible. Make sure Docker container is running.")
+    if response.status_code != 200:
+        pytest.skip(f"Could not fetch OpenAPI spec - Status: {response.status_code}")
+    return response.json().get("paths", {})
+
+@pytest.mark.parametrize("path,methods", EXPECTED_ENDPOINTS)
+def test_profile_endpoints(openapi_paths, path, methods):
+    """Test if our profile endpoints are listed with the expected methods"""
+    assert path in openapi_paths, f"Endpoint not found in OpenAPI spec: {path}"
+    assert methods <= openapi_paths[path].keys()
 
-    # Test 3: Test unauthorized access (should return 401/422)
+def test_profile_requires_auth():
+    """Test unauthorized access to the profile endpoint (should return 401/422)"""
     try:
-        response = requests.get(f"{BASE_URL}/api/v1/user/profile")
-        print(f"✓ Profile endpoint responded to unauthorized request: {response.status_code}")
-        if response.status_code in [401, 422]:
-            print("  ✓ Proper authorization required")
-        else:
-            print(f"  ? Unexpected status code: {response.status_code}")
-    except Exception as e:
-        print(f"✗ Error testing profile endpoint: {e}")
+        response = SESSION.get(f"{BASE_URL}/api/v1/user/profile", timeout=10)
+    except requests.exceptions.ConnectionError:
+        pytest.skip("API is not accessible. Make sure Docker container is running.")
+    assert response.status_code in (401, 422), f"Expected 401/422 but got {response.status_code}"
 
 def test_endpoints_accessible():
     """Test if our new endpoints are accessible (without auth for now)"""
     
     # Test if the API is running
     try:
-        response = requests.get(f"{BASE_URL}/")
+        response = SESSION.get(f"{BASE_URL}/", timeout=10)
         print(f"Root endpoint status: {response.status_code}")
         print(f"Root response: {response.json()}")
         assert response.status_code == 200, f"Expected 200 but got {response.status_code}"
@@ -76,7 +55,7 @@ def test_endpoints_accessible():
     
     # Test if our profile endpoint exists (should get 422 due to missing auth)
     try:
-        response = requests.get(f"{BASE_URL}/api/v1/profile")
+        response = SESSION.get(f"{BASE_URL}/api/v1/profile", timeout=10)
         print(f"Profile GET endpoint status: {response.status_code}")
         if response.status_code == 422:
             print("✓ Profile GET endpoint exists (422 = missing auth header)")
@@ -87,7 +66,7 @@ def test_endpoints_accessible():
     
     # Test if our profile/edit endpoint exists (should get 422 due to missing auth)
     try:
-        response = requests.put(f"{BASE_URL}/api/v1/profile/edit", json={"name": "test"})
+        response = SESSION.put(f"{BASE_URL}/api/v1/profile/edit", json={"name": "test"}, timeout=10)
         print(f"Profile PUT endpoint status: {response.status_code}")
         if response.status_code == 422:
             print("✓ Profile PUT endpoint exists (422 = missing auth header)")
@@ -97,7 +76,7 @@ def test_endpoints_accessible():
         print(f"Error testing profile PUT: {e}")
     
     # Test OpenAPI docs
-    response = requests.get(f"{BASE_URL}/docs")
+    response = SESSION.get(f"{BASE_URL}/docs", timeout=10)
     print(f"OpenAPI docs status: {response.status_code}")
     if response.status_code == 200:
         print("✓ OpenAPI docs accessible")
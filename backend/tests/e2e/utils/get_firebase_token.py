@@ -1,16 +1,31 @@
-import json, os, requests
+import json, os, time, jwt
 from dotenv import load_dotenv
+from tests.e2e.utils.http_session import SESSION
 
 load_dotenv()
 
+# Treat tokens as expired this many seconds early so none lapse mid-request
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+# (email, api_key) -> (idToken, exp) for tokens fetched in this process
+_TOKEN_CACHE: dict[tuple[str, str], tuple[str, float]] = {}
+
 def get_id_token(email, password, api_key):
+    cached = _TOKEN_CACHE.get((email, api_key))
+    if cached and time.time() < cached[1] - TOKEN_EXPIRY_MARGIN_SECONDS:
+        return cached[0]
+
     url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={api_key}"
     payload = {"email": email, "password": password, "returnSecureToken": True}
-    res = requests.post(url, json=payload)
+    res = SESSION.post(url, json=payload, timeout=10)
     if not res.ok:
         print(f"Firebase auth failed. Status: {res.status_code}")
         print(f"Response: {res.text}")
         print(f"Email: {email}")
         print(f"API Key: {api_key[:10]}..." if api_key else "None")
     res.raise_for_status()
-    return res.json()["idToken"]
+    token = res.json()["idToken"]
+    # Only the exp claim is needed here; the backend verifies the signature
+    exp = jwt.decode(token, options={"verify_signature": False})["exp"]
+    _TOKEN_CACHE[(email, api_key)] = (token, exp)
+    return token
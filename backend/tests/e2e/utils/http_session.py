@@ -0,0 +1,16 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared across e2e helpers and tests so connections (and TLS handshakes) are reused
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    # Only throttling and unavailability are retried, so genuine server errors reach tests at once;
+    # once retries run out, hand back the last response so tests can still assert on its status
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 503],
+                      raise_on_status=False),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)